@@ -1,3 +1,15 @@
 from .core import mrv_run
+from .anchoring import AnchorBackend, GanacheBackend, InMemoryBackend, TransparencyLogBackend
+from .anchor_cache import AnchorCache, CachedAnchorBackend
+from .replay import MRVFixture
 
-__all__ = ["mrv_run"]
+__all__ = [
+    "mrv_run",
+    "AnchorBackend",
+    "GanacheBackend",
+    "InMemoryBackend",
+    "TransparencyLogBackend",
+    "AnchorCache",
+    "CachedAnchorBackend",
+    "MRVFixture",
+]
@@ -0,0 +1,292 @@
+import hashlib
+import json
+import math
+import os
+import struct
+from typing import Any, Dict, List, Optional
+
+from .anchoring import AnchorBackend
+
+# ---- Bloom file layout ----
+# magic(8) | num_bits(Q) | num_hashes(I) | count(Q) | entries_bytes(Q) | bits
+BLOOM_MAGIC = b"GMRVBLM1"
+_BLOOM_HEADER = struct.Struct("<8sQIQQ")
+
+UNKNOWN_TX = "unknown"
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys (double hashing on BLAKE2b)."""
+
+    def __init__(self, num_bits: int, num_hashes: int, bits: Optional[bytearray] = None, count: int = 0):
+        self.num_bits = max(int(num_bits), 8)
+        self.num_hashes = max(int(num_hashes), 1)
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+        self.count = count
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float = 0.001) -> "BloomFilter":
+        capacity = max(int(capacity), 1)
+        num_bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        num_hashes = max(round(num_bits / capacity * math.log(2)), 1)
+        return cls(num_bits, num_hashes)
+
+    def _positions(self, key: str) -> List[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        h2 |= 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def add(self, key: str) -> None:
+        bits = self.bits
+        for p in self._positions(key):
+            bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+
+def cache_key(network: str, address: str, mrv_id: str) -> str:
+    return f"{network}|{address.lower()}|{mrv_id}"
+
+
+class AnchorCache:
+    """
+    Persisted record of anchored (mrv_id, hash, tx_hash), keyed by
+    network + contract address.
+
+    Entries live in an append-only JSONL file at `path`; a Bloom filter in
+    `path + ".bloom"` fronts them. Only the Bloom filter is read on open;
+    the entries are loaded on the first probable hit, so a negative answer
+    costs a few bit tests and no I/O. A torn final line is ignored (and
+    cut off before the next append); any other unreadable line raises
+    ValueError.
+    """
+
+    def __init__(self, path: str, *, capacity: int = 100_000, error_rate: float = 0.001):
+        self.path = path
+        self.bloom_path = path + ".bloom"
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+        self._entries: Optional[Dict[str, Dict[str, str]]] = None
+        self._f: Optional[Any] = None
+        self._dirty = False
+
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+
+        self.bloom = self._load_bloom()
+        if self.bloom is not None:
+            # The persisted filter may have grown past the requested capacity
+            self.capacity = int(self.bloom.num_bits * math.log(2) ** 2 / -math.log(error_rate))
+        else:
+            # Missing, stale or corrupt filter: rebuild from the entries
+            self._load_entries()
+            self._rebuild_bloom()
+
+    # -------------------------------
+    # Persistence
+    # -------------------------------
+    def _entries_size(self) -> int:
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def _load_bloom(self) -> Optional[BloomFilter]:
+        try:
+            with open(self.bloom_path, "rb") as f:
+                header = f.read(_BLOOM_HEADER.size)
+                magic, num_bits, num_hashes, count, entries_bytes = _BLOOM_HEADER.unpack(header)
+                bits = bytearray(f.read())
+        except (OSError, struct.error):
+            return None
+
+        if magic != BLOOM_MAGIC or len(bits) != (num_bits + 7) // 8:
+            return None
+        if entries_bytes != self._entries_size():
+            return None
+        return BloomFilter(num_bits, num_hashes, bits, count)
+
+    def _load_entries(self) -> Dict[str, Dict[str, str]]:
+        if self._entries is not None:
+            return self._entries
+
+        if self._f is not None:
+            self._f.flush()  # entries appended before the first load
+        entries: Dict[str, Dict[str, str]] = {}
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                for n, raw in enumerate(f):
+                    if not raw.endswith(b"\n"):
+                        break  # torn final line from a crash; only EOF lacks "\n"
+                    try:
+                        rec = json.loads(raw)
+                        key = rec["key"]
+                    except (ValueError, KeyError, TypeError):
+                        raise ValueError(f"Anchor cache {self.path}: unreadable entry on line {n + 1}")
+                    entries[key] = rec
+        self._entries = entries
+        return entries
+
+    def _rebuild_bloom(self) -> None:
+        entries = self._entries or {}
+        self.capacity = max(self.capacity, 2 * len(entries))
+        self.bloom = BloomFilter.for_capacity(self.capacity, self.error_rate)
+        for key in entries:
+            self.bloom.add(key)
+        self._dirty = True
+
+    def _open_for_append(self) -> None:
+        # Drop a torn final line so the next entry starts on a line of its own
+        if os.path.exists(self.path):
+            with open(self.path, "r+b") as f:
+                data = f.read()
+                if data and not data.endswith(b"\n"):
+                    f.truncate(data.rfind(b"\n") + 1)
+                    self._dirty = True
+        self._f = open(self.path, "a", encoding="utf-8")
+
+    def flush(self) -> None:
+        if self._f is not None:
+            self._f.flush()
+            os.fsync(self._f.fileno())
+        if not self._dirty:
+            return
+
+        tmp = self.bloom_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_BLOOM_HEADER.pack(
+                BLOOM_MAGIC,
+                self.bloom.num_bits,
+                self.bloom.num_hashes,
+                self.bloom.count,
+                self._entries_size()
+            ))
+            f.write(self.bloom.bits)
+        os.replace(tmp, self.bloom_path)
+        self._dirty = False
+
+    def close(self) -> None:
+        self.flush()
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    # -------------------------------
+    # Lookups
+    # -------------------------------
+    def might_contain(self, network: str, address: str, mrv_id: str) -> bool:
+        return cache_key(network, address, mrv_id) in self.bloom
+
+    def get(self, network: str, address: str, mrv_id: str) -> Optional[Dict[str, str]]:
+        key = cache_key(network, address, mrv_id)
+        if key not in self.bloom:
+            return None
+        return self._load_entries().get(key)
+
+    def add(self, network: str, address: str, mrv_id: str, sha256_hex: str, tx_hash: str) -> None:
+        key = cache_key(network, address, mrv_id)
+        rec = {"key": key, "mrv_id": mrv_id, "hash": sha256_hex.lower(), "tx_hash": tx_hash}
+
+        if self._f is None:
+            self._open_for_append()
+        self._f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+        if self._entries is not None:
+            self._entries[key] = rec
+
+        if self.bloom.count + 1 > self.capacity:
+            # Grow before the false-positive rate degrades
+            self._f.flush()
+            self._load_entries()
+            self.capacity *= 2
+            self._rebuild_bloom()
+        else:
+            self.bloom.add(key)
+        self._dirty = True
+
+
+class CachedAnchorBackend(AnchorBackend):
+    """
+    Makes anchoring idempotent, and verification cheap, in front of
+    another backend.
+
+    anchor():
+      - Bloom miss: anchor straight away, with no pre-check round-trip.
+      - Cache hit with the same hash: return the cached integrity fields.
+        With confirm=True, one read-only lookup first checks the record is
+        still on chain (e.g. Ganache was not reset).
+      - Cache hit with a different hash: ValueError, like the contract.
+        With confirm=True the chain decides: a stale entry whose anchor is
+        gone is registered again.
+
+    lookup():
+      - Cache hit: return the cached hash without RPC. With confirm=True
+        the hit is checked against the chain first.
+      - Bloom miss (or a false positive): ask the chain, and cache what it
+        returns so the next verification of that record needs no RPC.
+    """
+
+    def __init__(self, backend: AnchorBackend, cache: AnchorCache, *, confirm: bool = True):
+        self.backend = backend
+        self.cache = cache
+        self.confirm = confirm
+        self.network = backend.network
+
+    @property
+    def address(self) -> str:
+        return self.backend.address
+
+    def anchor(self, mrv_id: str, sha256_hex: str) -> Dict[str, str]:
+        sha256_hex = sha256_hex.lower()
+        entry = self.cache.get(self.network, self.address, mrv_id)
+
+        if entry is not None:
+            if not self.confirm:
+                if entry["hash"] != sha256_hex:
+                    raise ValueError("MRV already registered with a different hash")
+                return self._integrity(entry["tx_hash"])
+
+            # The chain is authoritative; the entry may predate a reset
+            onchain = self.backend.lookup(mrv_id)
+            if onchain == sha256_hex:
+                if entry["hash"] == sha256_hex:
+                    return self._integrity(entry["tx_hash"])
+                self.cache.add(self.network, self.address, mrv_id, sha256_hex, UNKNOWN_TX)
+                return self._integrity(UNKNOWN_TX)
+            if onchain is not None:
+                raise ValueError("MRV already registered with a different hash")
+            # Stale cache entry: the anchor is gone, register again
+
+        try:
+            anchored = self.backend.anchor(mrv_id, sha256_hex)
+        except Exception as e:
+            if "already registered" not in str(e):
+                raise
+            # Anchored before the cache existed; adopt it if it matches
+            if self.backend.lookup(mrv_id) != sha256_hex:
+                raise
+            anchored = self._integrity(UNKNOWN_TX)
+
+        self.cache.add(self.network, self.address, mrv_id, sha256_hex, anchored["tx_hash"])
+        return anchored
+
+    def lookup(self, mrv_id: str) -> Optional[str]:
+        entry = self.cache.get(self.network, self.address, mrv_id)
+        if entry is not None and not self.confirm:
+            return entry["hash"]
+
+        onchain = self.backend.lookup(mrv_id)
+        if onchain is not None and (entry is None or entry["hash"] != onchain):
+            self.cache.add(self.network, self.address, mrv_id, onchain, UNKNOWN_TX)
+        return onchain
+
+    def flush(self) -> None:
+        self.backend.flush()
+        self.cache.flush()
+
+    def close(self) -> None:
+        self.backend.close()
+        self.cache.close()
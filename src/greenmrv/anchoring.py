@@ -0,0 +1,205 @@
+import hashlib
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from .integrity import compute_mrv_sha256
+from .transparency_log import TransparencyLog
+
+GANACHE_NETWORK = "ganache-local"
+IN_MEMORY_NETWORK = "in-memory"
+TRANSPARENCY_LOG_NETWORK = "transparency-log"
+
+# ---- verify_mrv_json statuses ----
+STATUS_VALID = "VALID"
+STATUS_TAMPERED = "TAMPERED"
+STATUS_NOT_FOUND = "NOT_FOUND"
+STATUS_NOT_REGISTERED = "NOT_REGISTERED"
+
+
+class AnchorBackend(ABC):
+    """
+    Where MRV hashes get anchored.
+
+    anchor() returns the fields merged into the record's "integrity"
+    section: blockchain_network, contract_address and tx_hash.
+    """
+
+    network: str = "unknown"
+
+    @property
+    @abstractmethod
+    def address(self) -> str:
+        ...
+
+    @abstractmethod
+    def anchor(self, mrv_id: str, sha256_hex: str) -> Dict[str, str]:
+        ...
+
+    @abstractmethod
+    def lookup(self, mrv_id: str) -> Optional[str]:
+        """Anchored hash (lowercase hex) for mrv_id, or None if unknown."""
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def _integrity(self, tx_hash: str) -> Dict[str, str]:
+        return {
+            "blockchain_network": self.network,
+            "contract_address": self.address,
+            "tx_hash": tx_hash
+        }
+
+
+class GanacheBackend(AnchorBackend):
+    """
+    MRVRegistry on a local EVM chain (Ganache).
+    Deploys a fresh contract unless contract_address is given.
+    """
+
+    network = GANACHE_NETWORK
+
+    def __init__(self, *, rpc_url: Optional[str] = None, contract_address: Optional[str] = None):
+        from . import blockchain_ganache as chain
+
+        self._chain = chain
+        rpc_url = rpc_url or chain.GANACHE_RPC
+        if contract_address:
+            self.ctx = chain.load_contract(contract_address, rpc_url)
+        else:
+            self.ctx = chain.deploy_or_load_contract(rpc_url)
+
+    @property
+    def address(self) -> str:
+        return self.ctx["address"]
+
+    def anchor(self, mrv_id: str, sha256_hex: str) -> Dict[str, str]:
+        tx_hash = self._chain.register_mrv_hash(
+            mrv_id=mrv_id,
+            sha256_hex=sha256_hex,
+            contract_ctx=self.ctx
+        )
+        return self._integrity(tx_hash)
+
+    def lookup(self, mrv_id: str) -> Optional[str]:
+        return self._chain.get_mrv_hash(mrv_id=mrv_id, contract_ctx=self.ctx)
+
+
+class InMemoryBackend(AnchorBackend):
+    """Process-local registry for tests; nothing is persisted."""
+
+    network = IN_MEMORY_NETWORK
+
+    def __init__(self) -> None:
+        self.records: Dict[str, str] = {}
+
+    @property
+    def address(self) -> str:
+        return f"memory:{id(self):x}"
+
+    def anchor(self, mrv_id: str, sha256_hex: str) -> Dict[str, str]:
+        if not mrv_id:
+            raise ValueError("MRV ID required")
+        if mrv_id in self.records:
+            raise ValueError("MRV already registered")
+        self.records[mrv_id] = sha256_hex.lower()
+        tx = hashlib.sha256(f"{len(self.records)}:{mrv_id}:{sha256_hex}".encode("utf-8")).hexdigest()
+        return self._integrity("0x" + tx)
+
+    def lookup(self, mrv_id: str) -> Optional[str]:
+        return self.records.get(mrv_id)
+
+
+class TransparencyLogBackend(AnchorBackend):
+    """
+    Local append-only, hash-chained transparency log.
+    tx_hash is the entry's chain hash; contract_address is the log path.
+    """
+
+    network = TRANSPARENCY_LOG_NETWORK
+
+    def __init__(self, path: str, *, fsync_every: int = 1024):
+        self.log = TransparencyLog(path, fsync_every=fsync_every)
+
+    @property
+    def address(self) -> str:
+        return os.path.abspath(self.log.path)
+
+    def anchor(self, mrv_id: str, sha256_hex: str) -> Dict[str, str]:
+        entry = self.log.append(mrv_id, sha256_hex)
+        return self._integrity("0x" + entry["chain_hash"])
+
+    def lookup(self, mrv_id: str) -> Optional[str]:
+        entry = self.log.get(mrv_id)
+        return entry["sha256"] if entry else None
+
+    def flush(self) -> None:
+        self.log.flush()
+
+    def close(self) -> None:
+        self.log.close()
+
+
+def backend_for_integrity(integrity: Dict[str, Any]) -> AnchorBackend:
+    """
+    Open the backend a record was anchored to, from its integrity section.
+    """
+    network = integrity.get("blockchain_network")
+    address = integrity.get("contract_address")
+
+    if not address or address == "not_registered":
+        raise ValueError("No anchoring address found in MRV JSON.")
+    if network == GANACHE_NETWORK:
+        return GanacheBackend(contract_address=address)
+    if network == TRANSPARENCY_LOG_NETWORK:
+        if not os.path.exists(address):
+            raise ValueError(f"Transparency log not found: {address}")
+        return TransparencyLogBackend(address)
+    raise ValueError(f"Cannot verify records anchored to network: {network}")
+
+
+def verify_mrv_json(
+    mrv_json: Dict[str, Any],
+    *,
+    mrv_id: Optional[str] = None,
+    backend: Optional[AnchorBackend] = None
+) -> Dict[str, Any]:
+    """
+    Recompute the canonical hash and compare it with the anchored one.
+
+    Returns: {"mrv_id", "status", "computed_hash", "anchored_hash"}
+    status is one of VALID, TAMPERED, NOT_FOUND, NOT_REGISTERED.
+    """
+    mrv_id = mrv_id or mrv_json.get("mrv_id")
+    computed = compute_mrv_sha256(mrv_json)
+    result: Dict[str, Any] = {
+        "mrv_id": mrv_id,
+        "status": STATUS_NOT_REGISTERED,
+        "computed_hash": computed,
+        "anchored_hash": None
+    }
+
+    owns_backend = backend is None
+    if owns_backend:
+        address = mrv_json.get("integrity", {}).get("contract_address")
+        if not address or address == "not_registered":
+            return result
+        backend = backend_for_integrity(mrv_json["integrity"])
+
+    try:
+        anchored = backend.lookup(mrv_id) if mrv_id else None
+    finally:
+        if owns_backend:
+            backend.close()
+
+    result["anchored_hash"] = anchored
+    if anchored is None:
+        result["status"] = STATUS_NOT_FOUND
+    elif anchored == computed:
+        result["status"] = STATUS_VALID
+    else:
+        result["status"] = STATUS_TAMPERED
+    return result
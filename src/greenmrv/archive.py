@@ -0,0 +1,312 @@
+import glob
+import json
+import mmap
+import os
+import struct
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .carbon_intensity import iso_to_epoch
+
+# ---- Bundle layout ----
+# header:  magic(8) | codec(8, NUL padded)
+# frames:  one independently compressed frame per stored file
+#          (plus an optional zstd dictionary frame, stored raw)
+# index:   UTF-8 JSON, uncompressed
+# footer:  index_offset(Q) | index_len(Q) | footer magic(8)
+BUNDLE_MAGIC = b"GMRVBND1"
+FOOTER_MAGIC = b"GMRVIDX1"
+_HEADER = struct.Struct("<8s8s")
+_FOOTER = struct.Struct("<QQ8s")
+
+BUNDLE_SUFFIX = ".mrvb"
+ARCHIVE_SUBDIR = "archive"
+ZSTD_LEVEL = 10
+# Small JSON records compress poorly one frame at a time; a shared
+# dictionary trained on the bundle's own records restores most of the ratio.
+ZSTD_DICT_SIZE = 16 * 1024
+ZSTD_DICT_MIN_RECORDS = 32
+
+
+def _require_zstd():
+    try:
+        import zstandard as zstd
+    except Exception:
+        raise RuntimeError("zstandard not installed. Run: pip install zstandard")
+    return zstd
+
+
+class _Codec:
+    def __init__(self, name: str, dict_data: Optional[bytes] = None):
+        self.name = name
+        if name == "zstd":
+            zstd = _require_zstd()
+            zdict = zstd.ZstdCompressionDict(dict_data) if dict_data else None
+            self._c = zstd.ZstdCompressor(level=ZSTD_LEVEL, dict_data=zdict, write_content_size=True)
+            self._d = zstd.ZstdDecompressor(dict_data=zdict)
+        elif name != "zlib":
+            raise ValueError(f"Unsupported codec: {name}")
+
+    def compress(self, data: bytes) -> bytes:
+        if self.name == "zstd":
+            return self._c.compress(data)
+        return zlib.compress(data, 6)
+
+    def decompress(self, frame: Any, raw_len: int) -> bytes:
+        if self.name == "zstd":
+            return self._d.decompress(frame, max_output_size=raw_len)
+        return zlib.decompress(frame)
+
+
+def _train_zstd_dict(samples: List[bytes]) -> Optional[bytes]:
+    if len(samples) < ZSTD_DICT_MIN_RECORDS:
+        return None
+    zstd = _require_zstd()
+    try:
+        return zstd.train_dictionary(ZSTD_DICT_SIZE, samples).as_bytes()
+    except zstd.ZstdError:
+        return None
+
+
+def write_bundle(
+    bundle_path: str,
+    records: List[Tuple[str, bytes, Optional[bytes]]],
+    *,
+    codec: str = "zstd"
+) -> Dict[str, Any]:
+    """
+    Write a bundle from (mrv_id, json_bytes, csv_bytes_or_None) tuples.
+
+    Every file becomes its own compressed frame, so a single record can
+    be read back without touching the rest of the bundle.
+
+    Raises FileExistsError rather than replace an existing bundle.
+
+    Returns the bundle index.
+    """
+    if os.path.exists(bundle_path):
+        raise FileExistsError(f"Bundle already exists: {bundle_path}")
+
+    dict_data = _train_zstd_dict([j for _, j, _ in records]) if codec == "zstd" else None
+    c = _Codec(codec, dict_data)
+
+    index: Dict[str, Any] = {"codec": codec, "dict": None, "records": {}}
+    tmp = bundle_path + ".tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(bundle_path)), exist_ok=True)
+
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(BUNDLE_MAGIC, codec.encode("ascii")))
+
+        if dict_data:
+            index["dict"] = [f.tell(), len(dict_data)]
+            f.write(dict_data)
+
+        def put(data: bytes) -> List[int]:
+            frame = c.compress(data)
+            entry = [f.tell(), len(frame), len(data)]
+            f.write(frame)
+            return entry
+
+        for mrv_id, json_bytes, csv_bytes in records:
+            index["records"][mrv_id] = {
+                "json": put(json_bytes),
+                "csv": put(csv_bytes) if csv_bytes is not None else None
+            }
+
+        index_bytes = json.dumps(index, separators=(",", ":")).encode("utf-8")
+        index_offset = f.tell()
+        f.write(index_bytes)
+        f.write(_FOOTER.pack(index_offset, len(index_bytes), FOOTER_MAGIC))
+        f.flush()
+        os.fsync(f.fileno())
+
+    # link() fails if bundle_path appeared meanwhile, unlike os.replace()
+    try:
+        os.link(tmp, bundle_path)
+    finally:
+        os.remove(tmp)
+    return index
+
+
+class MRVBundle:
+    """
+    Read-only, memory-mapped view of a bundle.
+
+    Usage:
+        with MRVBundle("mrv_records/archive/bundle-....mrvb") as b:
+            mrv_json = b.read_json("MRV-...")
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, codec = _HEADER.unpack_from(self._mm, 0)
+        index_offset, index_len, footer_magic = _FOOTER.unpack_from(self._mm, len(self._mm) - _FOOTER.size)
+        if magic != BUNDLE_MAGIC or footer_magic != FOOTER_MAGIC:
+            self.close()
+            raise ValueError(f"Not an MRV bundle: {path}")
+
+        self.index = json.loads(self._mm[index_offset:index_offset + index_len])
+        self.records: Dict[str, Dict[str, Any]] = self.index["records"]
+
+        dict_data = None
+        if self.index.get("dict"):
+            off, length = self.index["dict"]
+            dict_data = bytes(self._mm[off:off + length])
+        self._codec = _Codec(codec.rstrip(b"\x00").decode("ascii"), dict_data)
+
+    def __enter__(self) -> "MRVBundle":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __contains__(self, mrv_id: str) -> bool:
+        return mrv_id in self.records
+
+    def ids(self) -> List[str]:
+        return list(self.records)
+
+    def _read(self, entry: List[int]) -> bytes:
+        off, clen, rawlen = entry
+        with memoryview(self._mm) as view:
+            return self._codec.decompress(view[off:off + clen], rawlen)
+
+    def read_json_bytes(self, mrv_id: str) -> bytes:
+        return self._read(self.records[mrv_id]["json"])
+
+    def read_json(self, mrv_id: str) -> Dict[str, Any]:
+        return json.loads(self.read_json_bytes(mrv_id))
+
+    def read_csv(self, mrv_id: str) -> Optional[bytes]:
+        entry = self.records[mrv_id]["csv"]
+        return self._read(entry) if entry else None
+
+
+# -------------------------------
+# Record access across loose files and bundles
+# -------------------------------
+def bundle_paths(out_dir: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(out_dir, ARCHIVE_SUBDIR, "*" + BUNDLE_SUFFIX)))
+
+
+def load_mrv_json(source: str, mrv_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load one MRV record from a JSON file, a bundle (mrv_id required) or
+    an out_dir (loose file first, then its bundles).
+
+    The result can be passed straight to compute_mrv_sha256 or
+    verify_mrv_json.
+    """
+    if source.endswith(BUNDLE_SUFFIX):
+        if not mrv_id:
+            raise ValueError("mrv_id is required to read from a bundle")
+        with MRVBundle(source) as b:
+            return b.read_json(mrv_id)
+
+    if os.path.isdir(source):
+        if not mrv_id:
+            raise ValueError("mrv_id is required to search a directory")
+        loose = os.path.join(source, f"{mrv_id}.json")
+        if os.path.exists(loose):
+            return load_mrv_json(loose)
+        for path in bundle_paths(source):
+            with MRVBundle(path) as b:
+                if mrv_id in b:
+                    return b.read_json(mrv_id)
+        raise KeyError(f"{mrv_id} not found in {source}")
+
+    with open(source, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def iter_mrv_records(out_dir: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (source, mrv_json) for every loose record and bundled record."""
+    for path in sorted(glob.glob(os.path.join(out_dir, "MRV-*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            yield path, json.load(f)
+    for path in bundle_paths(out_dir):
+        with MRVBundle(path) as b:
+            for mrv_id in b.ids():
+                yield f"{path}#{mrv_id}", b.read_json(mrv_id)
+
+
+# -------------------------------
+# Archiving
+# -------------------------------
+def _record_end_epoch(json_path: str, raw: bytes) -> float:
+    try:
+        return iso_to_epoch(json.loads(raw)["timestamps"]["end_time"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return os.path.getmtime(json_path)
+
+
+def archive_records(
+    out_dir: str,
+    *,
+    older_than_days: float = 30,
+    max_records: int = 10_000,
+    codec: str = "zstd",
+    keep_originals: bool = False
+) -> List[str]:
+    """
+    Pack records that ended more than older_than_days ago into bundles
+    under out_dir/archive/. Each bundle is read back and compared with
+    the source files before those files are deleted.
+
+    Returns the paths of the bundles written.
+    """
+    cutoff = time.time() - older_than_days * 86400
+
+    candidates: List[Tuple[str, str, bytes, Optional[str]]] = []
+    for json_path in sorted(glob.glob(os.path.join(out_dir, "MRV-*.json"))):
+        mrv_id = os.path.basename(json_path)[:-len(".json")]
+        with open(json_path, "rb") as f:
+            raw = f.read()
+        if _record_end_epoch(json_path, raw) > cutoff:
+            continue
+        csv_path = os.path.join(out_dir, f"{mrv_id}_codecarbon.csv")
+        candidates.append((mrv_id, json_path, raw, csv_path if os.path.exists(csv_path) else None))
+
+    # Microseconds plus a random token keep concurrent or back-to-back runs apart
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ") + "-" + uuid.uuid4().hex[:8]
+    written: List[str] = []
+
+    for n, start in enumerate(range(0, len(candidates), max_records)):
+        batch = candidates[start:start + max_records]
+        records = []
+        for mrv_id, _, raw, csv_path in batch:
+            csv_bytes = None
+            if csv_path:
+                with open(csv_path, "rb") as f:
+                    csv_bytes = f.read()
+            records.append((mrv_id, raw, csv_bytes))
+
+        bundle_path = os.path.join(out_dir, ARCHIVE_SUBDIR, f"bundle-{stamp}-{n:04d}{BUNDLE_SUFFIX}")
+        write_bundle(bundle_path, records, codec=codec)
+
+        with MRVBundle(bundle_path) as b:
+            for mrv_id, raw, csv_bytes in records:
+                if b.read_json_bytes(mrv_id) != raw or b.read_csv(mrv_id) != csv_bytes:
+                    raise RuntimeError(f"Bundle verification failed for {mrv_id} in {bundle_path}")
+
+        if not keep_originals:
+            for _, json_path, _, csv_path in batch:
+                os.remove(json_path)
+                if csv_path:
+                    os.remove(csv_path)
+
+        written.append(bundle_path)
+
+    return written
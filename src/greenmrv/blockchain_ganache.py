@@ -1,20 +1,45 @@
 from web3 import Web3
 from solcx import compile_standard
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 # ---- Ganache configuration ----
 GANACHE_RPC = "http://127.0.0.1:7545"
 SOLC_VERSION = "0.8.17"
 
+# ---- Minimal ABI for attaching to an already deployed MRVRegistry ----
+MRV_REGISTRY_ABI = [
+    {
+        "inputs": [
+            {"internalType": "string", "name": "mrvId", "type": "string"},
+            {"internalType": "bytes32", "name": "hash", "type": "bytes32"},
+        ],
+        "name": "registerMRV",
+        "outputs": [],
+        "stateMutability": "nonpayable",
+        "type": "function",
+    },
+    {
+        "inputs": [{"internalType": "string", "name": "mrvId", "type": "string"}],
+        "name": "getMRV",
+        "outputs": [
+            {"internalType": "bytes32", "name": "hash", "type": "bytes32"},
+            {"internalType": "uint256", "name": "timestamp", "type": "uint256"},
+            {"internalType": "address", "name": "submitter", "type": "address"},
+        ],
+        "stateMutability": "view",
+        "type": "function",
+    },
+]
 
-def deploy_or_load_contract() -> Dict[str, Any]:
+
+def deploy_or_load_contract(rpc_url: str = GANACHE_RPC) -> Dict[str, Any]:
     """
     Deploy MRVRegistry contract to Ganache.
     In prototype mode, we deploy once per run.
     Returns contract instance + address.
     """
-    w3 = Web3(Web3.HTTPProvider(GANACHE_RPC))
+    w3 = Web3(Web3.HTTPProvider(rpc_url))
     assert w3.is_connected(), "Ganache not running"
 
     account = w3.eth.accounts[0]
@@ -59,6 +84,40 @@ def deploy_or_load_contract() -> Dict[str, Any]:
     }
 
 
+def load_contract(contract_address: str, rpc_url: str = GANACHE_RPC) -> Dict[str, Any]:
+    """
+    Attach to an MRVRegistry that is already deployed.
+    Returns the same context shape as deploy_or_load_contract.
+    """
+    w3 = Web3(Web3.HTTPProvider(rpc_url))
+    if not w3.is_connected():
+        raise RuntimeError("Cannot connect to Ganache")
+
+    address = Web3.to_checksum_address(contract_address)
+    accounts = w3.eth.accounts
+
+    return {
+        "w3": w3,
+        "contract": w3.eth.contract(address=address, abi=MRV_REGISTRY_ABI),
+        "address": address,
+        "account": accounts[0] if accounts else None
+    }
+
+
+def get_mrv_hash(*, mrv_id: str, contract_ctx: Dict[str, Any]) -> Optional[str]:
+    """
+    Look up the registered hash for mrv_id.
+    Returns lowercase hex, or None if the ID is not registered.
+    """
+    try:
+        hash_bytes, _, _ = contract_ctx["contract"].functions.getMRV(mrv_id).call()
+    except Exception as e:
+        if "MRV not found" in str(e):
+            return None
+        raise
+    return bytes(hash_bytes).hex()
+
+
 def register_mrv_hash(
     *,
     mrv_id: str,
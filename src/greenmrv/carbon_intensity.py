@@ -0,0 +1,329 @@
+import csv
+import glob
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from .integrity import DERIVED_FIELD_NAME
+
+# ---- On-disk layout of an intensity table ----
+# <table_dir>/index.json     region index + time axis metadata
+# <table_dir>/intensity.f32  little-endian float32 matrix [n_regions, n_hours]
+TABLE_FORMAT = "greenmrv-ci-v1"
+INDEX_FILE = "index.json"
+VALUES_FILE = "intensity.f32"
+INTENSITY_UNIT = "kgCO2e/kWh"
+
+SECONDS_PER_HOUR = 3600
+
+
+def _require_numpy():
+    try:
+        import numpy as np
+    except Exception:
+        raise RuntimeError("numpy not installed. Run: pip install numpy")
+    return np
+
+
+def iso_to_epoch(ts: str) -> float:
+    """
+    Parse an MRV timestamp ("2024-01-01T00:00:00Z") to Unix seconds.
+    Naive timestamps are treated as UTC. Raises ValueError for anything
+    that is not a timestamp string (including None).
+    """
+    if not isinstance(ts, str):
+        raise ValueError(f"Not a timestamp: {ts!r}")
+    s = ts.strip()
+    if s.endswith("Z"):
+        s = s[:-1] + "+00:00"
+    dt = datetime.fromisoformat(s)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+@dataclass(frozen=True)
+class CarbonIntensityTable:
+    table_dir: str
+    version: str
+    regions: List[str]
+    region_index: Dict[str, int]
+    start_hour: int
+    values: Any  # numpy.memmap [n_regions, n_hours]
+
+    @property
+    def n_hours(self) -> int:
+        return int(self.values.shape[1])
+
+    def lookup(self, region_idx: Any, hours: Any) -> Any:
+        """
+        Vectorized lookup of intensity (kgCO2e/kWh).
+
+        region_idx: int array, -1 for unknown regions
+        hours:      int array of hours since the Unix epoch (UTC)
+
+        Returns a float64 array; NaN where the region is unknown,
+        the hour falls outside the table, or the cell is empty.
+        """
+        np = _require_numpy()
+        region_idx = np.asarray(region_idx, dtype=np.int64)
+        col = np.asarray(hours, dtype=np.int64) - self.start_hour
+
+        ok = (region_idx >= 0) & (col >= 0) & (col < self.n_hours)
+        out = np.full(region_idx.shape, np.nan, dtype=np.float64)
+        out[ok] = self.values[region_idx[ok], col[ok]]
+        return out
+
+
+def write_intensity_table(
+    table_dir: str,
+    *,
+    regions: Sequence[str],
+    start_time: str,
+    values: Any,
+    version: Optional[str] = None
+) -> str:
+    """
+    Write an hourly intensity table.
+
+    values must be shaped [len(regions), n_hours]; row r holds the
+    intensity for regions[r] starting at the hour containing start_time.
+    Missing cells should be NaN.
+
+    Returns: table_dir
+    """
+    np = _require_numpy()
+    arr = np.ascontiguousarray(values, dtype="<f4")
+    if arr.ndim != 2 or arr.shape[0] != len(regions):
+        raise ValueError("values must be shaped [len(regions), n_hours]")
+    if len(set(regions)) != len(regions):
+        raise ValueError("regions must be unique")
+
+    os.makedirs(table_dir, exist_ok=True)
+    arr.tofile(os.path.join(table_dir, VALUES_FILE))
+
+    start_hour = int(iso_to_epoch(start_time) // SECONDS_PER_HOUR)
+    index = {
+        "format": TABLE_FORMAT,
+        "version": version or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ"),
+        "unit": INTENSITY_UNIT,
+        "dtype": "<f4",
+        "start_hour": start_hour,
+        "n_hours": int(arr.shape[1]),
+        "regions": list(regions)
+    }
+    with open(os.path.join(table_dir, INDEX_FILE), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+
+    return table_dir
+
+
+def build_intensity_table_from_csv(
+    csv_path: str,
+    table_dir: str,
+    *,
+    version: Optional[str] = None
+) -> str:
+    """
+    Build a table from a long-format CSV with columns:
+      region, datetime (ISO, UTC), intensity_kg_per_kwh
+
+    Rows may come in any order; hours not present stay NaN.
+    """
+    np = _require_numpy()
+
+    region_ids: Dict[str, int] = {}
+    rows_r: List[int] = []
+    rows_h: List[int] = []
+    rows_v: List[float] = []
+
+    with open(csv_path, "r", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            region = (row.get("region") or "").strip()
+            if not region:
+                continue
+            r = region_ids.setdefault(region, len(region_ids))
+            rows_r.append(r)
+            rows_h.append(int(iso_to_epoch(row["datetime"]) // SECONDS_PER_HOUR))
+            rows_v.append(float(row["intensity_kg_per_kwh"]))
+
+    if not rows_r:
+        raise ValueError(f"No intensity rows found in {csv_path}")
+
+    r = np.asarray(rows_r, dtype=np.int64)
+    h = np.asarray(rows_h, dtype=np.int64)
+    start_hour = int(h.min())
+    values = np.full((len(region_ids), int(h.max()) - start_hour + 1), np.nan, dtype="<f4")
+    values[r, h - start_hour] = np.asarray(rows_v, dtype="<f4")
+
+    start_time = datetime.fromtimestamp(start_hour * SECONDS_PER_HOUR, tz=timezone.utc).isoformat()
+    return write_intensity_table(
+        table_dir,
+        regions=list(region_ids),
+        start_time=start_time,
+        values=values,
+        version=version
+    )
+
+
+def load_intensity_table(table_dir: str) -> CarbonIntensityTable:
+    """
+    Open a table written by write_intensity_table.
+    The value matrix is memory-mapped read-only; nothing is copied.
+    """
+    np = _require_numpy()
+
+    with open(os.path.join(table_dir, INDEX_FILE), "r", encoding="utf-8") as f:
+        index = json.load(f)
+
+    if index.get("format") != TABLE_FORMAT:
+        raise ValueError(f"Unsupported intensity table format: {index.get('format')}")
+
+    regions = list(index["regions"])
+    values = np.memmap(
+        os.path.join(table_dir, VALUES_FILE),
+        dtype=index.get("dtype", "<f4"),
+        mode="r",
+        shape=(len(regions), int(index["n_hours"]))
+    )
+
+    return CarbonIntensityTable(
+        table_dir=table_dir,
+        version=str(index.get("version", "unknown")),
+        regions=regions,
+        region_index={name: i for i, name in enumerate(regions)},
+        start_hour=int(index["start_hour"]),
+        values=values
+    )
+
+
+def recompute_co2(records: Sequence[Dict[str, Any]], table: CarbonIntensityTable) -> Any:
+    """
+    Recompute CO2 (kg) for many MRV records in one vectorized pass.
+
+    Each record's energy_kwh is spread uniformly over its
+    [start_time, end_time] window, split at hour boundaries, and each
+    hourly slice is multiplied by the intensity for the record's
+    hardware.region at that hour.
+
+    Returns a float64 array aligned with records; NaN where the record
+    has no energy reading or any slice has no intensity value.
+    """
+    np = _require_numpy()
+    n = len(records)
+    if n == 0:
+        return np.empty(0, dtype=np.float64)
+
+    energy = np.full(n, np.nan, dtype=np.float64)
+    start = np.zeros(n, dtype=np.float64)
+    end = np.zeros(n, dtype=np.float64)
+    region_idx = np.full(n, -1, dtype=np.int64)
+
+    for i, rec in enumerate(records):
+        # Parse everything first so a bad record leaves its row untouched (NaN)
+        try:
+            e = rec["energy_emissions"]["energy_kwh"]
+            ts = rec["timestamps"]
+            t0 = iso_to_epoch(ts["start_time"])
+            t1 = max(iso_to_epoch(ts["end_time"]), t0)
+            r = table.region_index.get((rec.get("hardware") or {}).get("region"), -1)
+            e = float(e) if e is not None else float("nan")
+        except (AttributeError, KeyError, TypeError, ValueError):
+            continue
+        energy[i] = e
+        start[i] = t0
+        end[i] = t1
+        region_idx[i] = r
+
+    # -------------------------------
+    # Explode records into hourly slices
+    # -------------------------------
+    h0 = np.floor(start / SECONDS_PER_HOUR).astype(np.int64)
+    h1 = np.floor(end / SECONDS_PER_HOUR).astype(np.int64)
+    # A run ending exactly on an hour boundary does not touch the next hour
+    h1 = np.where((end > start) & (end == h1 * SECONDS_PER_HOUR), h1 - 1, h1)
+    counts = h1 - h0 + 1
+
+    rec_of = np.repeat(np.arange(n), counts)
+    offsets = np.arange(rec_of.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    hours = h0[rec_of] + offsets
+
+    seg_start = np.maximum(start[rec_of], hours * SECONDS_PER_HOUR)
+    seg_end = np.minimum(end[rec_of], (hours + 1) * SECONDS_PER_HOUR)
+    duration = (end - start)[rec_of]
+    weight = np.divide(
+        seg_end - seg_start,
+        duration,
+        out=np.ones_like(duration),
+        where=duration > 0
+    )
+
+    intensity = table.lookup(region_idx[rec_of], hours)
+    seg_co2 = energy[rec_of] * weight * intensity
+
+    missing = np.bincount(rec_of, weights=np.isnan(seg_co2), minlength=n) > 0
+    co2 = np.bincount(rec_of, weights=np.nan_to_num(seg_co2), minlength=n)
+    co2[missing] = np.nan
+    return co2
+
+
+def _iter_record_paths(out_dir: str) -> Iterable[str]:
+    return sorted(glob.glob(os.path.join(out_dir, "MRV-*.json")))
+
+
+def _write_json_atomic(path: str, data: Dict[str, Any]) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def recompute_co2_for_dir(
+    out_dir: str,
+    table_dir: str,
+    *,
+    write: bool = True
+) -> Dict[str, Any]:
+    """
+    Recompute CO2 for every MRV JSON in out_dir against an intensity table.
+
+    Results are stored under the record's "derived" section, which is
+    excluded from the canonical hash, so the anchored json_sha256 stays
+    valid. The originally measured energy_emissions.co2_kg is untouched.
+
+    Returns: {"records": <int>, "updated": <int>, "missing": [mrv_id, ...]}
+    """
+    table = load_intensity_table(table_dir)
+
+    paths = list(_iter_record_paths(out_dir))
+    records = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            records.append(json.load(f))
+
+    co2 = recompute_co2(records, table)
+    computed_at = datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+    updated = 0
+    missing: List[str] = []
+    for path, rec, value in zip(paths, records, co2):
+        if value != value:  # NaN
+            missing.append(rec.get("mrv_id", os.path.basename(path)))
+            continue
+
+        derived = rec.setdefault(DERIVED_FIELD_NAME, {})
+        derived["co2_recomputed"] = {
+            "co2_kg": float(value),
+            "intensity_table_version": table.version,
+            "intensity_unit": INTENSITY_UNIT,
+            "method": "hourly_uniform_energy",
+            "computed_at": computed_at
+        }
+        if write:
+            _write_json_atomic(path, rec)
+        updated += 1
+
+    return {"records": len(records), "updated": updated, "missing": missing}
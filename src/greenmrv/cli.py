@@ -0,0 +1,158 @@
+import argparse
+import os
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .anchor_cache import AnchorCache, CachedAnchorBackend
+from .anchoring import (
+    STATUS_VALID,
+    AnchorBackend,
+    backend_for_integrity,
+    verify_mrv_json,
+)
+from .archive import BUNDLE_SUFFIX, MRVBundle, archive_records, iter_mrv_records, load_mrv_json
+from .core import default_out_dir
+from .regression import (
+    STATUS_REGRESSION,
+    build_baseline_index,
+    compare_latest,
+    compare_records,
+)
+
+
+def _cmd_archive(args: argparse.Namespace) -> int:
+    bundles = archive_records(
+        args.out_dir,
+        older_than_days=args.older_than_days,
+        max_records=args.max_records,
+        codec=args.codec,
+        keep_originals=args.keep
+    )
+    for path in bundles:
+        print(f"[greenmrv] Bundle written: {path}")
+    if not bundles:
+        print("[greenmrv] Nothing to archive")
+    return 0
+
+
+def _iter_sources(paths: List[str], mrv_id: Optional[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    for path in paths:
+        if mrv_id:
+            yield path, load_mrv_json(path, mrv_id)
+        elif os.path.isdir(path):
+            yield from iter_mrv_records(path)
+        elif path.endswith(BUNDLE_SUFFIX):
+            with MRVBundle(path) as b:
+                for rid in b.ids():
+                    yield f"{path}#{rid}", b.read_json(rid)
+        else:
+            yield path, load_mrv_json(path)
+
+
+def _cmd_verify(args: argparse.Namespace) -> int:
+    # One backend per anchor, shared by every record anchored there
+    backends: Dict[Tuple[str, str], AnchorBackend] = {}
+    cache = AnchorCache(args.cache) if args.cache else None
+    failed = 0
+    try:
+        for source, mrv_json in _iter_sources(args.paths, args.id):
+            integrity = mrv_json.get("integrity", {})
+            key = (integrity.get("blockchain_network"), integrity.get("contract_address"))
+            try:
+                if key[1] and key[1] != "not_registered" and key not in backends:
+                    backend = backend_for_integrity(integrity)
+                    if cache is not None:
+                        backend = CachedAnchorBackend(backend, cache, confirm=args.confirm)
+                    backends[key] = backend
+                status = verify_mrv_json(mrv_json, backend=backends.get(key))["status"]
+            except Exception as e:
+                status = f"ERROR ({e})"
+            if status != STATUS_VALID:
+                failed += 1
+            print(f"{status}\t{mrv_json.get('mrv_id')}\t{source}")
+    finally:
+        for backend in backends.values():
+            backend.close()
+        if cache is not None:
+            cache.close()
+    return 1 if failed else 0
+
+
+def _fmt(x: Optional[float], spec: str) -> str:
+    return "-" if x is None else format(x, spec)
+
+
+def _cmd_compare(args: argparse.Namespace) -> int:
+    if not os.path.isdir(args.out_dir):
+        print(f"[greenmrv] Records directory not found: {args.out_dir}", file=sys.stderr)
+        return 2
+    index = build_baseline_index(args.out_dir, args.index, rebuild=args.rebuild)
+    opts = {
+        "window": args.window,
+        "threshold": args.threshold,
+        "z_threshold": args.z,
+        "min_runs": args.min_runs,
+    }
+
+    if args.records:
+        findings = compare_records(index, [load_mrv_json(p) for p in args.records], **opts)
+    else:
+        findings = compare_latest(index, candidate_ids=args.id, **opts)
+
+    for f in findings:
+        print(
+            f"{f['status']}\t{f['mrv_id']}\t{f['metric']}\t"
+            f"value={_fmt(f['value'], '.6g')}\t"
+            f"baseline={_fmt(f['baseline_median'], '.6g')} (n={f['baseline_runs']})\t"
+            f"change={_fmt(f['change'], '+.1%')}\tz={_fmt(f['z'], '.2f')}\t{f['group']}"
+        )
+
+    regressions = sum(f["status"] == STATUS_REGRESSION for f in findings)
+    print(f"[greenmrv] {len(findings)} checks, {regressions} regressions")
+    return 1 if regressions else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="greenmrv", description="Green MRV record tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("archive", help="Pack older MRV records into compressed bundles.")
+    p.add_argument("--out-dir", default=default_out_dir())
+    p.add_argument("--older-than-days", type=float, default=30)
+    p.add_argument("--max-records", type=int, default=10_000, help="Records per bundle.")
+    p.add_argument("--codec", choices=["zstd", "zlib"], default="zstd")
+    p.add_argument("--keep", action="store_true", help="Keep the original files.")
+    p.set_defaults(func=_cmd_archive)
+
+    p = sub.add_parser("verify", help="Verify MRV records against their anchors.")
+    p.add_argument("paths", nargs="+", help="MRV JSON files, bundles or record directories.")
+    p.add_argument("--id", help="Only verify this mrv_id.")
+    p.add_argument("--cache", help="Anchor cache file; cached records are verified without RPC.")
+    p.add_argument("--confirm", action="store_true", help="With --cache, re-check cached records on chain.")
+    p.set_defaults(func=_cmd_verify)
+
+    p = sub.add_parser(
+        "compare",
+        help="Flag runs whose energy per epoch/sample regressed against earlier runs.",
+    )
+    p.add_argument("records", nargs="*", help="Candidate MRV JSON files (default: latest run per experiment).")
+    p.add_argument("--out-dir", default=default_out_dir(), help="Records that form the baseline.")
+    p.add_argument("--index", help="Baseline index path (default: <out-dir>/baseline_index.json).")
+    p.add_argument("--rebuild", action="store_true", help="Rebuild the index from scratch.")
+    p.add_argument("--id", action="append", help="Check this indexed mrv_id (repeatable).")
+    p.add_argument("--threshold", type=float, default=0.10, help="Relative increase that counts as a regression.")
+    p.add_argument("--z", type=float, default=3.0, help="Robust z-score a regression must also exceed.")
+    p.add_argument("--min-runs", type=int, default=3, help="Baseline runs needed before flagging.")
+    p.add_argument("--window", type=int, default=20, help="Most recent baseline runs to use.")
+    p.set_defaults(func=_cmd_compare)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
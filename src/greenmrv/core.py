@@ -4,14 +4,19 @@ import time
 import uuid
 from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 
-from .hardware import detect_hardware
+from .hardware import detect_hardware, open_nvml
 from .schema import build_mrv_json
 from .framework import detect_framework
 from .codecarbon_csv import parse_codecarbon_csv
 from .integrity import compute_mrv_sha256
-from .blockchain_ganache import deploy_or_load_contract, register_mrv_hash
+from .anchoring import AnchorBackend, GanacheBackend
+from .live import EnergyBudgetExceeded, LiveMonitor, default_shm_name
+from .replay import MRVFixture
+
+# CodeCarbon's default is 15 s; live mode needs fresher tracker readings
+LIVE_MEASURE_POWER_SECS = 1
 
 
 def utc_now_iso() -> str:
@@ -34,6 +39,39 @@ def get_pkg_version(pkg_name: str) -> str:
         return "unknown"
 
 
+def resolve_framework(framework: Optional[str], framework_version: Optional[str]) -> List[Optional[str]]:
+    """Returns [framework, framework_version]."""
+    if framework is None or framework.strip() == "" or framework.lower() == "auto":
+        fw = detect_framework()
+        return [fw.name, fw.version]
+
+    if framework_version is None:
+        name = framework.lower()
+        if name in {"torch", "pytorch"}:
+            return ["PyTorch", get_pkg_version("torch")]
+        elif name in {"tensorflow", "tf"}:
+            return ["TensorFlow", get_pkg_version("tensorflow")]
+        elif name == "jax":
+            return ["JAX", get_pkg_version("jax")]
+        return [framework, "unknown"]
+
+    return [framework, framework_version]
+
+
+def _capture(fixture: Optional[MRVFixture], key: str, fn: Callable[[], Any]) -> Any:
+    return fixture.capture(key, fn) if fixture is not None else fn()
+
+
+def _release(tracker: Any, nvml_session: Any) -> None:
+    if tracker is not None:
+        try:
+            tracker.stop()
+        except Exception:
+            pass
+    if nvml_session is not None:
+        nvml_session.close()
+
+
 @contextmanager
 def mrv_run(
     *,
@@ -44,8 +82,15 @@ def mrv_run(
     framework_version: Optional[str] = None,
     epochs: Optional[int] = None,
     batch_size: Optional[int] = None,
+    num_samples: Optional[int] = None,
     region: str = "local_grid",
-    out_dir: Optional[str] = None
+    out_dir: Optional[str] = None,
+    live: bool = False,
+    total_steps: Optional[int] = None,
+    energy_budget_kwh: Optional[float] = None,
+    on_budget_exceeded: Optional[Callable[[Dict[str, float]], None]] = None,
+    anchor_backend: Optional[AnchorBackend] = None,
+    fixture: Optional[MRVFixture] = None
 ) -> Dict[str, Any]:
     """
     Usage:
@@ -64,90 +109,156 @@ def mrv_run(
     - Measure emissions
     - Build MRV JSON
     - Canonical SHA-256 hash
-    - Register hash on Ganache
+    - Register hash on Ganache (or the given anchor_backend)
     - Save final JSON with blockchain proof
+
+    anchor_backend defaults to a fresh GanacheBackend. Pass
+    TransparencyLogBackend("mrv_records/transparency.log") for local
+    tamper-evidence without a blockchain, or InMemoryBackend() in tests.
+
+    num_samples is the total number of samples processed (all epochs);
+    in live mode it defaults to the samples counted by step().
+
+    Live mode (live=True, implied by energy_budget_kwh):
+        with mrv_run(..., total_steps=1000, energy_budget_kwh=0.5) as info:
+            for batch in loader:
+                train_step(batch)
+                info["live"].step(samples=len(batch))
+
+    Each step() publishes energy per step, samples per joule and the
+    projected total to shared memory (info["live_shm_name"]); poll it with
+    `python -m greenmrv.live <name>`. When the budget is exceeded,
+    on_budget_exceeded is called, or, without a callback, training is
+    stopped early and the MRV record is still finalized.
+
+    Record / replay (fixture=MRVFixture.record(path) / .replay(path)):
+    recording captures every measured or nondeterministic input; replaying
+    serves them back without CodeCarbon, NVML or a chain, producing
+    byte-identical MRV JSON. See greenmrv.replay.
     """
 
-    try:
-        from codecarbon import EmissionsTracker
-    except Exception:
-        raise RuntimeError("codecarbon not installed. Run: pip install codecarbon")
+    replaying = fixture is not None and fixture.replaying
+
+    if not replaying:
+        try:
+            from codecarbon import EmissionsTracker
+        except Exception:
+            raise RuntimeError("codecarbon not installed. Run: pip install codecarbon")
 
     # -------------------------------
     # Framework auto-detection
     # -------------------------------
-    if framework is None or framework.strip() == "" or framework.lower() == "auto":
-        fw = detect_framework()
-        framework = fw.name
-        framework_version = fw.version
-    elif framework_version is None:
-        name = framework.lower()
-        if name in {"torch", "pytorch"}:
-            framework = "PyTorch"
-            framework_version = get_pkg_version("torch")
-        elif name in {"tensorflow", "tf"}:
-            framework = "TensorFlow"
-            framework_version = get_pkg_version("tensorflow")
-        elif name == "jax":
-            framework = "JAX"
-            framework_version = get_pkg_version("jax")
-        else:
-            framework_version = "unknown"
+    framework, framework_version = _capture(
+        fixture, "framework", lambda: resolve_framework(framework, framework_version)
+    )
 
     # -------------------------------
     # Identifiers & directories
     # -------------------------------
-    mrv_id = f"MRV-{uuid.uuid4()}"
+    mrv_id = _capture(fixture, "mrv_id", lambda: f"MRV-{uuid.uuid4()}")
     out_dir = out_dir or default_out_dir()
     ensure_dir(out_dir)
 
-    hardware = detect_hardware(region=region)
-
-    # -------------------------------
-    # Blockchain init (ONCE per run)
-    # -------------------------------
-    blockchain_ctx = deploy_or_load_contract()
-
-    start_time = utc_now_iso()
-    t0 = time.time()
-
-    codecarbon_csv = os.path.join(out_dir, f"{mrv_id}_codecarbon.csv")
-
-    tracker = EmissionsTracker(
-        project_name=experiment_name,
-        output_dir=out_dir,
-        output_file=f"{mrv_id}_codecarbon.csv",
-        log_level="error"
-    )
-
-    tracker.start()
+    # NVML stays initialized for the whole run (None without NVIDIA GPUs)
+    nvml_session = None if replaying else open_nvml()
+    tracker = None
+    monitor: Optional[LiveMonitor] = None
+    try:
+        hardware = _capture(
+            fixture, "hardware", lambda: detect_hardware(region=region, nvml_session=nvml_session)
+        )
 
-    info: Dict[str, Any] = {
-        "mrv_id": mrv_id,
-        "json_path": None,
-        "mrv_json": None,
-        "codecarbon_csv": codecarbon_csv
-    }
+        # -------------------------------
+        # Blockchain init (ONCE per run)
+        # -------------------------------
+        backend: Optional[AnchorBackend] = None
+        if not replaying:
+            backend = anchor_backend if anchor_backend is not None else GanacheBackend()
+
+        start_time = _capture(fixture, "start_time", utc_now_iso)
+        t0 = _capture(fixture, "t0", time.time)
+
+        codecarbon_csv = os.path.join(out_dir, f"{mrv_id}_codecarbon.csv")
+
+        live = live or energy_budget_kwh is not None
+        tracker_kwargs: Dict[str, Any] = {}
+        if live:
+            tracker_kwargs["measure_power_secs"] = LIVE_MEASURE_POWER_SECS
+
+        if not replaying:
+            tracker = EmissionsTracker(
+                project_name=experiment_name,
+                output_dir=out_dir,
+                output_file=f"{mrv_id}_codecarbon.csv",
+                log_level="error",
+                **tracker_kwargs
+            )
+            tracker.start()
+
+        if nvml_session is not None:
+            nvml_session.start_sampling()
+
+        info: Dict[str, Any] = {
+            "mrv_id": mrv_id,
+            "json_path": None,
+            "mrv_json": None,
+            "codecarbon_csv": codecarbon_csv,
+            "live": None,
+            "live_shm_name": None,
+            "budget_exceeded": False
+        }
+
+        if live:
+            monitor = LiveMonitor(
+                tracker,
+                total_steps=total_steps,
+                energy_budget_kwh=energy_budget_kwh,
+                on_budget_exceeded=on_budget_exceeded,
+                shm_name=default_shm_name(mrv_id)
+            )
+            info["live"] = monitor
+            info["live_shm_name"] = monitor.shm_name
+            print(f"[greenmrv] Live telemetry: python -m greenmrv.live {monitor.shm_name}")
+    except BaseException:
+        # The run never started; release what was opened before re-raising
+        _release(tracker, nvml_session)
+        raise
 
     try:
         yield info
 
+    except EnergyBudgetExceeded as e:
+        print(f"[greenmrv] {e}; stopping early")
+
     finally:
+        if monitor is not None:
+            info["budget_exceeded"] = monitor.budget_exceeded
+            if num_samples is None and monitor.samples:
+                num_samples = monitor.samples
+            monitor.close()
+
         # -------------------------------
         # Stop measurement
         # -------------------------------
-        try:
-            co2_kg = tracker.stop()
-        except Exception:
-            co2_kg = None
+        def stop_tracker() -> Optional[float]:
+            try:
+                return tracker.stop()
+            except Exception:
+                return None
 
-        duration_seconds = int(round(time.time() - t0))
-        end_time = utc_now_iso()
+        co2_kg = _capture(fixture, "tracker_co2_kg", stop_tracker)
+
+        gpu_energy = _capture(
+            fixture, "gpu_energy", lambda: nvml_session.stop() if nvml_session is not None else None
+        )
+
+        duration_seconds = int(round(_capture(fixture, "t1", time.time) - t0))
+        end_time = _capture(fixture, "end_time", utc_now_iso)
 
         # -------------------------------
         # Parse CodeCarbon output
         # -------------------------------
-        parsed = parse_codecarbon_csv(codecarbon_csv)
+        parsed = _capture(fixture, "codecarbon_csv", lambda: parse_codecarbon_csv(codecarbon_csv))
         energy_kwh = parsed["energy_kwh"]
 
         if co2_kg is None and parsed["co2_kg"] is not None:
@@ -165,14 +276,16 @@ def mrv_run(
             framework_version=framework_version or "unknown",
             epochs=epochs,
             batch_size=batch_size,
+            num_samples=num_samples,
             hardware=hardware,
             measurement_tool="CodeCarbon",
-            tool_version=get_pkg_version("codecarbon"),
+            tool_version=_capture(fixture, "codecarbon_version", lambda: get_pkg_version("codecarbon")),
             energy_kwh=energy_kwh,
             co2_kg=float(co2_kg) if co2_kg is not None else None,
             duration_seconds=duration_seconds,
             start_time=start_time,
-            end_time=end_time
+            end_time=end_time,
+            gpu_energy_per_device=gpu_energy
         )
 
         # -------------------------------
@@ -181,20 +294,18 @@ def mrv_run(
         mrv_hash = compute_mrv_sha256(mrv_json)
         mrv_json["integrity"]["json_sha256"] = mrv_hash
 
+        if _capture(fixture, "json_sha256", lambda: mrv_hash) != mrv_hash:
+            raise RuntimeError(f"Replay diverged from fixture {fixture.path}: MRV hash differs")
+
         # -------------------------------
-        # Register hash on Ganache
+        # Anchor hash (Ganache by default)
         # -------------------------------
-        tx_hash = register_mrv_hash(
-            mrv_id=mrv_id,
-            sha256_hex=mrv_hash,
-            contract_ctx=blockchain_ctx
-        )
+        anchored = _capture(fixture, "anchor", lambda: backend.anchor(mrv_id, mrv_hash))
+        if backend is not None:
+            backend.flush()
+        tx_hash = anchored["tx_hash"]
 
-        mrv_json["integrity"].update({
-            "blockchain_network": "ganache-local",
-            "contract_address": blockchain_ctx["address"],
-            "tx_hash": tx_hash
-        })
+        mrv_json["integrity"].update(anchored)
 
         # -------------------------------
         # Save FINAL MRV JSON
@@ -206,12 +317,15 @@ def mrv_run(
         info["json_path"] = json_path
         info["mrv_json"] = mrv_json
 
+        if fixture is not None:
+            fixture.save()
+
         # -------------------------------
         # Logs
         # -------------------------------
         print(f"[greenmrv] MRV ID: {mrv_id}")
         print(f"[greenmrv] SHA-256: {mrv_hash}")
         print(f"[greenmrv] Blockchain TX: {tx_hash}")
-        print(f"[greenmrv] Contract: {blockchain_ctx['address']}")
+        print(f"[greenmrv] Contract: {anchored['contract_address']}")
         print(f"[greenmrv] MRV JSON saved: {json_path}")
         print(f"[greenmrv] CodeCarbon CSV: {codecarbon_csv}")
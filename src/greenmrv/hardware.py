@@ -1,31 +1,179 @@
-from typing import Any, Dict
+import threading
+import time
+from typing import Any, Dict, List, Optional
 import psutil
 import cpuinfo
 
-def detect_hardware(region: str = "local_grid") -> Dict[str, Any]:
-    cpu = cpuinfo.get_cpu_info()
-    cpu_name = cpu.get("brand_raw") or cpu.get("brand") or "unknown"
+MJ_PER_KWH = 3.6e9
 
-    ram_gb = round(psutil.virtual_memory().total / (1024 ** 3))
 
-    gpu_type = "unknown"
-    num_gpus = 0
+def _nvml_str(x: Any) -> str:
+    # pynvml < 11.5 returns bytes, newer releases return str
+    if isinstance(x, bytes):
+        return x.decode("utf-8", errors="ignore")
+    return str(x)
+
+
+def _try(fn: Any, *args: Any) -> Any:
+    try:
+        return fn(*args)
+    except Exception:
+        return None
+
+
+class NvmlSession:
+    """
+    NVML kept initialized for a whole run, with per-device energy sampling
+    in one background thread.
+
+    Energy comes from nvmlDeviceGetTotalEnergyConsumption (mJ counter)
+    where the device supports it, otherwise from integrating
+    nvmlDeviceGetPowerUsage (mW) over the sampling interval.
+
+    `nvml` is the pynvml module by default; pass a stub with the same
+    functions to run without GPUs.
+    """
+
+    def __init__(self, nvml: Any = None, *, interval_s: float = 1.0):
+        if nvml is None:
+            import pynvml as nvml  # optional
+        nvml.nvmlInit()
+
+        self.nvml = nvml
+        self.interval_s = interval_s
+        try:
+            self.handles = [nvml.nvmlDeviceGetHandleByIndex(i) for i in range(nvml.nvmlDeviceGetCount())]
+        except Exception:
+            nvml.nvmlShutdown()
+            raise
+
+        n = len(self.handles)
+        self._use_counter = [False] * n
+        self._counter_start = [0.0] * n
+        self._energy_mj = [0.0] * n
+        self._last_power_mw: List[Optional[float]] = [None] * n
+        self._last_t = 0.0
+        self._samples = 0
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def devices(self) -> List[Dict[str, Any]]:
+        nvml = self.nvml
+        out = []
+        for i, h in enumerate(self.handles):
+            mem = _try(nvml.nvmlDeviceGetMemoryInfo, h)
+            limit_mw = _try(nvml.nvmlDeviceGetPowerManagementLimit, h)
+            name = _try(nvml.nvmlDeviceGetName, h)
+            out.append({
+                "index": i,
+                "name": _nvml_str(name) if name is not None else "unknown",
+                "memory_total_mb": int(mem.total // (1024 ** 2)) if mem is not None else None,
+                "power_limit_w": round(limit_mw / 1000.0, 1) if limit_mw is not None else None
+            })
+        return out
 
-    # Best-effort: NVIDIA detection if pynvml is installed
+    # -------------------------------
+    # Sampling
+    # -------------------------------
+    def start_sampling(self) -> None:
+        nvml = self.nvml
+        for i, h in enumerate(self.handles):
+            start = _try(nvml.nvmlDeviceGetTotalEnergyConsumption, h)
+            self._use_counter[i] = start is not None
+            self._counter_start[i] = float(start or 0)
+        self._last_t = time.monotonic()
+        self._sample(self._last_t)
+
+        self._thread = threading.Thread(target=self._run, name="greenmrv-nvml", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self._sample(time.monotonic())
+
+    def _sample(self, now: float) -> None:
+        nvml = self.nvml
+        dt = now - self._last_t
+        for i, h in enumerate(self.handles):
+            if self._use_counter[i]:
+                total = _try(nvml.nvmlDeviceGetTotalEnergyConsumption, h)
+                if total is not None:
+                    self._energy_mj[i] = float(total) - self._counter_start[i]
+                continue
+
+            power = _try(nvml.nvmlDeviceGetPowerUsage, h)
+            prev = self._last_power_mw[i]
+            if power is not None and prev is not None:
+                # Trapezoid rule: mW * s = mJ
+                self._energy_mj[i] += (prev + power) / 2.0 * dt
+            self._last_power_mw[i] = power
+        self._last_t = now
+        self._samples += 1
+
+    def stop(self) -> List[Dict[str, Any]]:
+        """
+        Stop sampling, shut NVML down and return per-device energy:
+        [{"index", "energy_kwh", "method"}]
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self._sample(time.monotonic())
+
+        result = [
+            {
+                "index": i,
+                "energy_kwh": self._energy_mj[i] / MJ_PER_KWH,
+                "method": "energy_counter" if self._use_counter[i] else "power_polling"
+            }
+            for i in range(len(self.handles))
+        ]
+        self.close()
+        return result
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        _try(self.nvml.nvmlShutdown)
+
+
+def open_nvml(nvml: Any = None, *, interval_s: float = 1.0) -> Optional[NvmlSession]:
+    """NvmlSession if NVML is available and sees at least one GPU, else None."""
     try:
-        import pynvml  # optional
-        pynvml.nvmlInit()
-        num_gpus = pynvml.nvmlDeviceGetCount()
-        if num_gpus > 0:
-            handle = pynvml.nvmlDeviceGetHandleByIndex(0)
-            gpu_type = pynvml.nvmlDeviceGetName(handle).decode("utf-8", errors="ignore")
-        pynvml.nvmlShutdown()
+        session = NvmlSession(nvml, interval_s=interval_s)
     except Exception:
-        pass
+        return None
+    if not session.handles:
+        session.close()
+        return None
+    return session
+
+
+def detect_hardware(region: str = "local_grid", nvml_session: Optional[NvmlSession] = None) -> Dict[str, Any]:
+    cpu = cpuinfo.get_cpu_info()
+    cpu_name = cpu.get("brand_raw") or cpu.get("brand") or "unknown"
+
+    ram_gb = round(psutil.virtual_memory().total / (1024 ** 3))
+
+    # Best-effort: NVIDIA detection if pynvml is installed. A caller-owned
+    # session stays initialized; otherwise NVML is opened just for this.
+    session = nvml_session if nvml_session is not None else open_nvml()
+    gpus = session.devices() if session is not None else []
+    if session is not None and nvml_session is None:
+        session.close()
 
     return {
-        "gpu_type": gpu_type,
-        "num_gpus": int(num_gpus),
+        "gpu_type": gpus[0]["name"] if gpus else "unknown",
+        "num_gpus": len(gpus),
+        "gpus": gpus,
         "cpu_type": cpu_name,
         "ram_gb": int(ram_gb),
         "region": region
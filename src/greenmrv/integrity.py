@@ -3,6 +3,8 @@ import hashlib
 from typing import Any, Dict
 
 INTEGRITY_FIELD_NAME = "integrity"
+# Values recomputed after anchoring (e.g. CO2 against revised grid factors)
+DERIVED_FIELD_NAME = "derived"
 
 
 def canonicalize_mrv_json(mrv_json: Dict[str, Any]) -> bytes:
@@ -10,7 +12,7 @@ def canonicalize_mrv_json(mrv_json: Dict[str, Any]) -> bytes:
     Canonicalize MRV JSON for deterministic hashing.
 
     Rules:
-    - Remove the 'integrity' field entirely
+    - Remove the 'integrity' and 'derived' fields entirely
     - Sort all keys recursively
     - Remove whitespace
     - UTF-8 encoding
@@ -21,8 +23,9 @@ def canonicalize_mrv_json(mrv_json: Dict[str, Any]) -> bytes:
     # Defensive shallow copy
     data = dict(mrv_json)
 
-    # Remove integrity section if present
+    # Remove integrity / derived sections if present
     data.pop(INTEGRITY_FIELD_NAME, None)
+    data.pop(DERIVED_FIELD_NAME, None)
 
     canonical_str = json.dumps(
         data,
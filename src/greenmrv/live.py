@@ -0,0 +1,267 @@
+import math
+import struct
+import sys
+import time
+import warnings
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Optional
+
+# ---- Shared-memory snapshot layout ----
+# A seqlock: the writer bumps `seq` to odd before writing the payload and
+# back to even afterwards. Readers retry until they see the same even seq
+# on both sides of the payload, so neither side ever takes a lock.
+SNAPSHOT_FIELDS = (
+    "steps",
+    "samples",
+    "elapsed_s",
+    "energy_kwh",
+    "energy_per_step_kwh",
+    "samples_per_joule",
+    "projected_total_kwh",
+    "budget_kwh",
+    "budget_exceeded",
+)
+_SEQ = struct.Struct("<Q")
+_PAYLOAD = struct.Struct("<" + "d" * len(SNAPSHOT_FIELDS))
+SNAPSHOT_SIZE = _SEQ.size + _PAYLOAD.size
+
+JOULES_PER_KWH = 3.6e6
+
+_warned_no_total_energy = False
+
+
+class EnergyBudgetExceeded(RuntimeError):
+    """Raised from LiveMonitor.step() when the energy budget is exceeded."""
+
+    def __init__(self, snapshot: Dict[str, float]):
+        super().__init__(
+            f"Energy budget exceeded: {snapshot['energy_kwh']:.6f} kWh "
+            f"> {snapshot['budget_kwh']:.6f} kWh"
+        )
+        self.snapshot = snapshot
+
+
+def default_shm_name(mrv_id: str) -> str:
+    # Short enough for macOS' 31-char POSIX shm limit
+    return "gmrv_" + mrv_id.replace("MRV-", "").replace("-", "")[:16]
+
+
+def read_tracker_energy_kwh(tracker: Any) -> Optional[float]:
+    """
+    Cumulative energy (kWh) the running CodeCarbon tracker has measured.
+    Reads the in-memory total directly; no CSV flush.
+
+    This relies on the private `_total_energy` attribute (an Energy with
+    a `.kWh` field) that CodeCarbon 2.x keeps on BaseEmissionsTracker. If
+    a CodeCarbon release drops it, a RuntimeWarning is issued once and
+    live rates stay NaN; the final MRV record is unaffected.
+    """
+    global _warned_no_total_energy
+    if tracker is None:
+        return None
+    if not hasattr(tracker, "_total_energy"):
+        if not _warned_no_total_energy:
+            _warned_no_total_energy = True
+            warnings.warn(
+                f"{type(tracker).__name__} has no _total_energy attribute; live energy "
+                "telemetry is unavailable with this CodeCarbon version",
+                RuntimeWarning,
+                stacklevel=2
+            )
+        return None
+    total = tracker._total_energy
+    kwh = getattr(total, "kWh", total)
+    try:
+        return float(kwh) if kwh is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _nan_if_none(x: Optional[float]) -> float:
+    return float("nan") if x is None else float(x)
+
+
+class LiveMonitor:
+    """
+    Per-step energy telemetry for a running mrv_run.
+
+    Call step() once per training step. Each call reads the tracker's
+    running energy total, derives energy per step, samples per joule and
+    a projected total, and publishes them to a shared-memory snapshot
+    that another process can poll with LiveSnapshotReader.
+    """
+
+    def __init__(
+        self,
+        tracker: Any,
+        *,
+        total_steps: Optional[int] = None,
+        energy_budget_kwh: Optional[float] = None,
+        on_budget_exceeded: Optional[Callable[[Dict[str, float]], None]] = None,
+        shm_name: Optional[str] = None,
+        energy_reader: Callable[[Any], Optional[float]] = read_tracker_energy_kwh
+    ):
+        self.tracker = tracker
+        self.total_steps = total_steps
+        self.energy_budget_kwh = energy_budget_kwh
+        self.on_budget_exceeded = on_budget_exceeded
+        self._read_energy = energy_reader
+
+        self.steps = 0
+        self.samples = 0
+        self.budget_exceeded = False
+        self._t0 = time.monotonic()
+
+        # Tracker readings only move every measure interval; rates are
+        # taken between the last two distinct readings.
+        self._last_kwh = 0.0
+        self._last_steps = 0
+        self._last_samples = 0
+        self._kwh_per_step: Optional[float] = None
+        self._samples_per_joule: Optional[float] = None
+
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._seq = 0
+        if shm_name is not None:
+            self._shm = shared_memory.SharedMemory(name=shm_name, create=True, size=SNAPSHOT_SIZE)
+            self._publish(self.snapshot())
+
+    @property
+    def shm_name(self) -> Optional[str]:
+        return self._shm.name if self._shm is not None else None
+
+    def step(self, samples: int = 0) -> Dict[str, float]:
+        """
+        Record one completed step of `samples` samples.
+
+        Returns the current snapshot. When the energy budget is exceeded,
+        on_budget_exceeded is called once; without a callback,
+        EnergyBudgetExceeded is raised (mrv_run treats that as an early stop).
+        """
+        self.steps += 1
+        self.samples += samples
+
+        kwh = self._read_energy(self.tracker)
+        if kwh is not None and kwh > self._last_kwh and self.steps > self._last_steps:
+            d_kwh = kwh - self._last_kwh
+            self._kwh_per_step = d_kwh / (self.steps - self._last_steps)
+            d_samples = self.samples - self._last_samples
+            self._samples_per_joule = d_samples / (d_kwh * JOULES_PER_KWH) if d_samples else None
+            self._last_kwh = kwh
+            self._last_steps = self.steps
+            self._last_samples = self.samples
+
+        snap = self.snapshot()
+        self._publish(snap)
+
+        if (
+            not self.budget_exceeded
+            and self.energy_budget_kwh is not None
+            and snap["energy_kwh"] > self.energy_budget_kwh
+        ):
+            self.budget_exceeded = True
+            snap["budget_exceeded"] = 1.0
+            self._publish(snap)
+            if self.on_budget_exceeded is not None:
+                self.on_budget_exceeded(snap)
+            else:
+                raise EnergyBudgetExceeded(snap)
+
+        return snap
+
+    def snapshot(self) -> Dict[str, float]:
+        # Extrapolate from the last tracker reading so the budget check
+        # does not lag a whole measure interval behind.
+        since_reading = self.steps - self._last_steps
+        energy = self._last_kwh + (self._kwh_per_step or 0.0) * since_reading
+
+        projected = None
+        if self.total_steps is not None and self._kwh_per_step is not None:
+            projected = energy + self._kwh_per_step * max(self.total_steps - self.steps, 0)
+
+        return {
+            "steps": float(self.steps),
+            "samples": float(self.samples),
+            "elapsed_s": time.monotonic() - self._t0,
+            "energy_kwh": energy,
+            "energy_per_step_kwh": _nan_if_none(self._kwh_per_step),
+            "samples_per_joule": _nan_if_none(self._samples_per_joule),
+            "projected_total_kwh": _nan_if_none(projected),
+            "budget_kwh": _nan_if_none(self.energy_budget_kwh),
+            "budget_exceeded": 1.0 if self.budget_exceeded else 0.0,
+        }
+
+    def _publish(self, snap: Dict[str, float]) -> None:
+        if self._shm is None:
+            return
+        buf = self._shm.buf
+        self._seq += 1
+        _SEQ.pack_into(buf, 0, self._seq)
+        _PAYLOAD.pack_into(buf, _SEQ.size, *(snap[k] for k in SNAPSHOT_FIELDS))
+        self._seq += 1
+        _SEQ.pack_into(buf, 0, self._seq)
+
+    def close(self) -> None:
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+class LiveSnapshotReader:
+    """
+    Read-only view of a LiveMonitor snapshot from another process.
+
+    Usage:
+        reader = LiveSnapshotReader("gmrv_...")
+        print(reader.read())
+    """
+
+    def __init__(self, name: str):
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13 always registers attached segments with the
+            # resource tracker, which would unlink them on exit.
+            from multiprocessing import resource_tracker
+            self._shm = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+
+    def read(self, max_retries: int = 1000) -> Optional[Dict[str, float]]:
+        buf = self._shm.buf
+        for _ in range(max_retries):
+            before = _SEQ.unpack_from(buf, 0)[0]
+            if before & 1:
+                continue
+            values = _PAYLOAD.unpack_from(buf, _SEQ.size)
+            if _SEQ.unpack_from(buf, 0)[0] == before:
+                return dict(zip(SNAPSHOT_FIELDS, values))
+        return None
+
+    def close(self) -> None:
+        self._shm.close()
+
+
+def watch(name: str, interval: float = 1.0) -> None:
+    """Print snapshots every `interval` seconds until interrupted."""
+    reader = LiveSnapshotReader(name)
+    try:
+        while True:
+            snap = reader.read()
+            if snap is not None:
+                parts = [
+                    f"{k}={v:.6g}" for k, v in snap.items() if not math.isnan(v)
+                ]
+                print("[greenmrv-live] " + " ".join(parts), flush=True)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m greenmrv.live <shm_name> [interval_s]")
+        sys.exit(2)
+    watch(sys.argv[1], float(sys.argv[2]) if len(sys.argv) > 2 else 1.0)
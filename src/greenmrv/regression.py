@@ -0,0 +1,245 @@
+import json
+import os
+from statistics import median
+from typing import Any, Dict, List, Optional, Tuple
+
+from .archive import ARCHIVE_SUBDIR, BUNDLE_SUFFIX, MRVBundle
+
+INDEX_FORMAT = "greenmrv-baseline-v1"
+INDEX_FILE = "baseline_index.json"
+METRICS = ("energy_per_epoch_kwh", "energy_per_sample_kwh")
+
+# Scale factor that makes the MAD a consistent estimator of sigma
+MAD_TO_SIGMA = 1.4826
+
+STATUS_OK = "OK"
+STATUS_REGRESSION = "REGRESSION"
+STATUS_NO_BASELINE = "NO_BASELINE"
+
+
+def group_key(mrv_json: Dict[str, Any]) -> str:
+    """Runs are only compared with runs of the same experiment on the same hardware."""
+    exp = mrv_json.get("experiment") or {}
+    hw = mrv_json.get("hardware") or {}
+    return "|".join([
+        str(exp.get("experiment_name")),
+        str(exp.get("model_name")),
+        f"{hw.get('gpu_type')}x{hw.get('num_gpus')}",
+        str(hw.get("cpu_type")),
+    ])
+
+
+def _ratio(num: Any, den: Any) -> Optional[float]:
+    if num is None or not den:
+        return None
+    return float(num) / float(den)
+
+
+def record_metrics(mrv_json: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Energy-efficiency row for one record, or None if it has no energy.
+    """
+    energy = (mrv_json.get("energy_emissions") or {}).get("energy_kwh")
+    if energy is None:
+        return None
+    training = mrv_json.get("training") or {}
+    return {
+        "mrv_id": mrv_json.get("mrv_id"),
+        "group": group_key(mrv_json),
+        "end_time": str((mrv_json.get("timestamps") or {}).get("end_time") or ""),
+        "energy_per_epoch_kwh": _ratio(energy, training.get("epochs")),
+        "energy_per_sample_kwh": _ratio(energy, training.get("num_samples")),
+    }
+
+
+# -------------------------------
+# Baseline index
+# -------------------------------
+def _scan(out_dir: str) -> Dict[str, Tuple[float, int]]:
+    """{path: (mtime, size)} for loose records and bundles."""
+    found: Dict[str, Tuple[float, int]] = {}
+    for d, match in ((out_dir, ".json"), (os.path.join(out_dir, ARCHIVE_SUBDIR), BUNDLE_SUFFIX)):
+        if not os.path.isdir(d):
+            continue
+        with os.scandir(d) as it:
+            for e in it:
+                if e.name.startswith(("MRV-", "bundle-")) and e.name.endswith(match):
+                    st = e.stat()
+                    found[e.path] = (st.st_mtime, st.st_size)
+    return found
+
+
+def _safe_metrics(mrv_json: Any) -> Optional[Dict[str, Any]]:
+    # A malformed record is left out of the baseline rather than failing the gate
+    try:
+        return record_metrics(mrv_json)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _rows_for(path: str) -> List[Dict[str, Any]]:
+    if path.endswith(BUNDLE_SUFFIX):
+        with MRVBundle(path) as b:
+            rows = [_safe_metrics(b.read_json(mrv_id)) for mrv_id in b.ids()]
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            rows = [_safe_metrics(json.load(f))]
+    return [r for r in rows if r is not None]
+
+
+def build_baseline_index(
+    out_dir: str,
+    index_path: Optional[str] = None,
+    *,
+    rebuild: bool = False
+) -> Dict[str, Any]:
+    """
+    Build or incrementally refresh the per-experiment baseline index.
+
+    Only files whose (mtime, size) changed since the last build are
+    parsed again. Each group's rows are kept sorted by end_time.
+    """
+    index_path = index_path or os.path.join(out_dir, INDEX_FILE)
+
+    files: Dict[str, Any] = {}
+    if not rebuild and os.path.exists(index_path):
+        with open(index_path, "r", encoding="utf-8") as f:
+            old = json.load(f)
+        if old.get("format") == INDEX_FORMAT:
+            files = old.get("files", {})
+
+    current = _scan(out_dir)
+    for path in list(files):
+        if path not in current:
+            del files[path]
+    for path, (mtime, size) in current.items():
+        cached = files.get(path)
+        if cached and cached["mtime"] == mtime and cached["size"] == size:
+            continue
+        try:
+            rows = _rows_for(path)
+        except (OSError, ValueError):
+            continue
+        files[path] = {"mtime": mtime, "size": size, "rows": rows}
+
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for entry in files.values():
+        for row in entry["rows"]:
+            groups.setdefault(row["group"], []).append(row)
+    for rows in groups.values():
+        rows.sort(key=lambda r: r["end_time"])
+
+    index = {"format": INDEX_FORMAT, "files": files, "groups": groups}
+    os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+    tmp = index_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+    os.replace(tmp, index_path)
+    return index
+
+
+# -------------------------------
+# Comparison
+# -------------------------------
+def robust_stats(values: List[float]) -> Tuple[float, float]:
+    """(median, MAD) of values."""
+    m = median(values)
+    return m, median(abs(v - m) for v in values)
+
+
+def compare_run(
+    row: Dict[str, Any],
+    baseline: List[Dict[str, Any]],
+    *,
+    threshold: float = 0.10,
+    z_threshold: float = 3.0,
+    min_runs: int = 3
+) -> List[Dict[str, Any]]:
+    """
+    Compare one run against baseline rows, per metric.
+
+    A metric regresses when it is more than `threshold` (relative) above
+    the baseline median AND more than `z_threshold` robust standard
+    deviations (MAD-based) above it. With a zero MAD only the relative
+    threshold applies.
+    """
+    findings = []
+    for metric in METRICS:
+        value = row.get(metric)
+        if value is None:
+            continue
+        values = [b[metric] for b in baseline if b.get(metric) is not None]
+
+        finding = {
+            "mrv_id": row["mrv_id"],
+            "group": row["group"],
+            "metric": metric,
+            "value": value,
+            "baseline_runs": len(values),
+            "baseline_median": None,
+            "change": None,
+            "z": None,
+            "status": STATUS_NO_BASELINE,
+        }
+        if len(values) >= min_runs:
+            med, mad = robust_stats(values)
+            sigma = mad * MAD_TO_SIGMA
+            change = (value - med) / med if med else 0.0
+            z = (value - med) / sigma if sigma else None
+            regressed = change > threshold and (z is None or z > z_threshold)
+            finding.update({
+                "baseline_median": med,
+                "change": change,
+                "z": z,
+                "status": STATUS_REGRESSION if regressed else STATUS_OK,
+            })
+        findings.append(finding)
+    return findings
+
+
+def compare_latest(
+    index: Dict[str, Any],
+    *,
+    candidate_ids: Optional[List[str]] = None,
+    window: int = 20,
+    **kwargs: Any
+) -> List[Dict[str, Any]]:
+    """
+    Compare runs against the `window` most recent earlier runs of their group.
+
+    candidate_ids selects the runs to check; by default the latest run
+    of every group is checked.
+    """
+    wanted = set(candidate_ids) if candidate_ids else None
+    findings: List[Dict[str, Any]] = []
+
+    for rows in index["groups"].values():
+        if wanted is None:
+            positions = [len(rows) - 1]
+        else:
+            positions = [i for i, r in enumerate(rows) if r["mrv_id"] in wanted]
+        for i in positions:
+            baseline = rows[max(i - window, 0):i]
+            findings.extend(compare_run(rows[i], baseline, **kwargs))
+    return findings
+
+
+def compare_records(
+    index: Dict[str, Any],
+    records: List[Dict[str, Any]],
+    *,
+    window: int = 20,
+    **kwargs: Any
+) -> List[Dict[str, Any]]:
+    """
+    Compare MRV records (e.g. fresh CI runs outside out_dir) against the
+    `window` most recent indexed runs of their group.
+    """
+    findings: List[Dict[str, Any]] = []
+    for mrv_json in records:
+        row = record_metrics(mrv_json)
+        if row is None:
+            continue
+        rows = [r for r in index["groups"].get(row["group"], []) if r["mrv_id"] != row["mrv_id"]]
+        findings.extend(compare_run(row, rows[-window:], **kwargs))
+    return findings
@@ -0,0 +1,74 @@
+import json
+import os
+from typing import Any, Callable, Dict
+
+FIXTURE_FORMAT = "greenmrv-fixture-v1"
+
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+
+class MRVFixture:
+    """
+    Recorded measurements of one mrv_run.
+
+    In record mode every nondeterministic input of the pipeline (run ID,
+    framework and hardware detection, clock readings, tracker and NVML
+    results, anchoring response) is captured and saved to `path` when the
+    run finishes. In replay mode those values are served from the file
+    instead: no CodeCarbon, NVML or chain access happens, and the run
+    produces byte-identical MRV JSON and hashes.
+
+    Usage:
+        with mrv_run(..., fixture=MRVFixture.record("run.fixture.json")):
+            train()
+
+        with mrv_run(..., fixture=MRVFixture.replay("run.fixture.json")):
+            pass
+    """
+
+    def __init__(self, path: str, mode: str):
+        if mode not in {MODE_RECORD, MODE_REPLAY}:
+            raise ValueError(f"Unknown fixture mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.values: Dict[str, Any] = {}
+
+        if mode == MODE_REPLAY:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") != FIXTURE_FORMAT:
+                raise ValueError(f"Unsupported fixture format: {data.get('format')}")
+            self.values = data["values"]
+
+    @classmethod
+    def record(cls, path: str) -> "MRVFixture":
+        return cls(path, MODE_RECORD)
+
+    @classmethod
+    def replay(cls, path: str) -> "MRVFixture":
+        return cls(path, MODE_REPLAY)
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == MODE_REPLAY
+
+    def capture(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Record fn() under key, or return the recorded value without calling fn."""
+        if self.replaying:
+            if key not in self.values:
+                raise RuntimeError(f"Fixture {self.path} has no recorded value for {key!r}")
+            return self.values[key]
+
+        value = fn()
+        # Store what replay will see (tuples become lists, etc.)
+        self.values[key] = json.loads(json.dumps(value))
+        return self.values[key]
+
+    def save(self) -> None:
+        if self.replaying:
+            return
+        parent = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(parent, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"format": FIXTURE_FORMAT, "values": self.values}, f, indent=2, ensure_ascii=False)
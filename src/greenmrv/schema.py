@@ -1,4 +1,4 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 def build_mrv_json(
     *,
@@ -10,6 +10,7 @@ def build_mrv_json(
     framework_version: str,
     epochs: Optional[int],
     batch_size: Optional[int],
+    num_samples: Optional[int] = None,
     hardware: Dict[str, Any],
     measurement_tool: str,
     tool_version: str,
@@ -17,7 +18,8 @@ def build_mrv_json(
     co2_kg: Optional[float],
     duration_seconds: int,
     start_time: str,
-    end_time: str
+    end_time: str,
+    gpu_energy_per_device: Optional[List[Dict[str, Any]]] = None
 ) -> Dict[str, Any]:
     return {
         "schema_version": "0.1",
@@ -33,7 +35,8 @@ def build_mrv_json(
             "framework": framework,
             "framework_version": framework_version,
             "epochs": epochs,
-            "batch_size": batch_size
+            "batch_size": batch_size,
+            "num_samples": num_samples
         },
 
         "hardware": hardware,
@@ -43,7 +46,8 @@ def build_mrv_json(
             "tool_version": tool_version,
             "energy_kwh": energy_kwh,
             "co2_kg": co2_kg,
-            "duration_seconds": duration_seconds
+            "duration_seconds": duration_seconds,
+            "gpu_energy_per_device": gpu_energy_per_device or []
         },
 
         "timestamps": {
@@ -0,0 +1,338 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+# ---- Hashing (RFC 6962 domain separation) ----
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+GENESIS_CHAIN = b"\x00" * 32
+
+
+def _sha256(data: bytes) -> bytes:
+    return hashlib.sha256(data).digest()
+
+
+def leaf_hash(mrv_id: str, sha256_hex: str) -> bytes:
+    return _sha256(LEAF_PREFIX + mrv_id.encode("utf-8") + b"\x00" + bytes.fromhex(sha256_hex))
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return _sha256(NODE_PREFIX + left + right)
+
+
+def _split(n: int) -> int:
+    """Largest power of two strictly smaller than n (n >= 2)."""
+    return 1 << ((n - 1).bit_length() - 1)
+
+
+class TransparencyLog:
+    """
+    Append-only, hash-chained log of (mrv_id, sha256) entries.
+
+    Every entry stores chain_i = SHA-256(chain_{i-1} || leaf_i), so any
+    edit to the file breaks the chain from that line on. Entries are also
+    the leaves of an RFC 6962 Merkle tree, which gives O(log n) inclusion
+    and consistency proofs.
+
+    File format: one JSON object per line
+        {"i": <index>, "id": <mrv_id>, "h": <sha256 hex>, "c": <chain hex>}
+
+    Appends go to a buffered file and are fsynced every `fsync_every`
+    entries, on flush() and on close(). Entries after the last fsync can be
+    lost in a crash; a torn final line is ignored on open and truncated
+    before the next append. Any other damage (an unreadable line, a wrong
+    index, a broken chain) raises ValueError. Opening without appending never writes, so a
+    verifier can read the file while a single writer appends to it.
+    """
+
+    def __init__(self, path: str, *, fsync_every: int = 1024):
+        self.path = path
+        self.fsync_every = max(int(fsync_every), 1)
+
+        # _levels[k][j] is the root of the complete subtree over
+        # leaves [j * 2**k, (j + 1) * 2**k)
+        self._levels: List[List[bytes]] = [[]]
+        self._chain = GENESIS_CHAIN
+        self._index: Dict[str, int] = {}
+        self._entries: List[str] = []  # sha256 hex per leaf
+        self._chains: List[bytes] = []
+        self._unsynced = 0
+        self._good_bytes = 0
+        self._f: Optional[Any] = None  # opened on first append
+
+        self._load()
+
+    # -------------------------------
+    # Loading / replay
+    # -------------------------------
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+
+        good_bytes = 0
+        with open(self.path, "rb") as f:
+            for raw in f:
+                i = len(self._entries)
+                if not raw.endswith(b"\n"):
+                    break  # torn final line from a crash; only EOF lacks "\n"
+                try:
+                    rec = json.loads(raw)
+                    mrv_id, sha256_hex = rec["id"], rec["h"]
+                except (ValueError, KeyError, TypeError):
+                    raise ValueError(f"Transparency log {self.path}: unreadable entry {i}")
+                if rec.get("i") != i:
+                    raise ValueError(f"Transparency log {self.path}: bad index at entry {i}")
+                self._add(mrv_id, sha256_hex)
+                if self._chain.hex() != rec.get("c"):
+                    raise ValueError(f"Transparency log {self.path}: hash chain broken at entry {i}")
+                good_bytes += len(raw)
+        self._good_bytes = good_bytes
+
+    def _add(self, mrv_id: str, sha256_hex: str) -> bytes:
+        leaf = leaf_hash(mrv_id, sha256_hex)
+        self._chain = _sha256(self._chain + leaf)
+
+        self._index[mrv_id] = len(self._entries)
+        self._entries.append(sha256_hex)
+        self._chains.append(self._chain)
+
+        # Fold completed subtrees upwards
+        levels = self._levels
+        levels[0].append(leaf)
+        k = 0
+        while len(levels[k]) % 2 == 0:
+            if len(levels) == k + 1:
+                levels.append([])
+            levels[k + 1].append(node_hash(levels[k][-2], levels[k][-1]))
+            k += 1
+        return leaf
+
+    # -------------------------------
+    # Appending
+    # -------------------------------
+    @property
+    def size(self) -> int:
+        return len(self._entries)
+
+    def append(self, mrv_id: str, sha256_hex: str) -> Dict[str, Any]:
+        """
+        Append an entry. Raises ValueError if mrv_id is already logged.
+
+        Returns: {"index": <int>, "leaf_hash": <hex>, "chain_hash": <hex>}
+        """
+        if not mrv_id:
+            raise ValueError("MRV ID required")
+        if mrv_id in self._index:
+            raise ValueError("MRV already registered")
+        sha256_hex = sha256_hex.lower()
+        if len(sha256_hex) != 64:
+            raise ValueError("sha256_hex must be 64 hex characters")
+
+        if self._f is None:
+            self._open_for_append()
+
+        i = len(self._entries)
+        leaf = self._add(mrv_id, sha256_hex)
+        chain_hex = self._chain.hex()
+
+        self._f.write(
+            f'{{"i":{i},"id":{json.dumps(mrv_id, ensure_ascii=False)},'
+            f'"h":"{sha256_hex}","c":"{chain_hex}"}}\n'
+        )
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self.flush()
+
+        return {"index": i, "leaf_hash": leaf.hex(), "chain_hash": chain_hex}
+
+    def _open_for_append(self) -> None:
+        parent = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(parent, exist_ok=True)
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if size != self._good_bytes:
+            with open(self.path, "r+b") as f:
+                f.seek(self._good_bytes)
+                # Only a torn final line may be dropped; anything else means
+                # the file changed since it was loaded
+                if size < self._good_bytes or b"\n" in f.read():
+                    raise ValueError(f"Transparency log {self.path} changed since it was opened")
+                f.truncate(self._good_bytes)
+        self._f = open(self.path, "a", encoding="utf-8")
+
+    def flush(self) -> None:
+        if self._f is None or self._unsynced == 0:
+            return
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._unsynced = 0
+
+    def close(self) -> None:
+        if self._f is None:
+            return
+        self.flush()
+        self._f.close()
+        self._f = None
+
+    def __enter__(self) -> "TransparencyLog":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # -------------------------------
+    # Lookups
+    # -------------------------------
+    def get(self, mrv_id: str) -> Optional[Dict[str, Any]]:
+        i = self._index.get(mrv_id)
+        if i is None:
+            return None
+        return {
+            "index": i,
+            "mrv_id": mrv_id,
+            "sha256": self._entries[i],
+            "leaf_hash": self._levels[0][i].hex(),
+            "chain_hash": self._chains[i].hex()
+        }
+
+    # -------------------------------
+    # Merkle tree
+    # -------------------------------
+    def _mth(self, start: int, end: int) -> bytes:
+        n = end - start
+        if n == 0:
+            return _sha256(b"")
+        if n & (n - 1) == 0 and start % n == 0:
+            k = n.bit_length() - 1
+            return self._levels[k][start >> k]
+        k = _split(n)
+        return node_hash(self._mth(start, start + k), self._mth(start + k, end))
+
+    def _check_size(self, size: Optional[int]) -> int:
+        size = self.size if size is None else size
+        if not 0 <= size <= self.size:
+            raise ValueError(f"Tree size {size} out of range (log has {self.size} entries)")
+        return size
+
+    def root(self, size: Optional[int] = None) -> bytes:
+        """Merkle tree head over the first `size` entries (default: all)."""
+        return self._mth(0, self._check_size(size))
+
+    def inclusion_proof(self, index: int, size: Optional[int] = None) -> List[bytes]:
+        size = self._check_size(size)
+        if not 0 <= index < size:
+            raise ValueError(f"Index {index} not in tree of size {size}")
+
+        proof: List[bytes] = []
+        start, end, m = 0, size, index
+        while end - start > 1:
+            k = _split(end - start)
+            if m < k:
+                proof.append(self._mth(start + k, end))
+                end = start + k
+            else:
+                proof.append(self._mth(start, start + k))
+                start, m = start + k, m - k
+        proof.reverse()
+        return proof
+
+    def consistency_proof(self, old_size: int, new_size: Optional[int] = None) -> List[bytes]:
+        """
+        Proof that the tree of old_size entries is a prefix of the tree
+        of new_size entries (RFC 6962 section 2.1.2).
+        """
+        new_size = self._check_size(new_size)
+        if not 0 <= old_size <= new_size:
+            raise ValueError(f"old_size {old_size} not in [0, {new_size}]")
+        if old_size == 0 or old_size == new_size:
+            return []
+
+        proof: List[bytes] = []
+        start, end, m, complete = 0, new_size, old_size, True
+        while m != end - start:
+            k = _split(end - start)
+            if m <= k:
+                proof.append(self._mth(start + k, end))
+                end = start + k
+            else:
+                proof.append(self._mth(start, start + k))
+                start, m, complete = start + k, m - k, False
+        if not complete:
+            proof.append(self._mth(start, end))
+        proof.reverse()
+        return proof
+
+
+def verify_inclusion(
+    leaf: bytes,
+    index: int,
+    size: int,
+    root: bytes,
+    proof: List[bytes]
+) -> bool:
+    """RFC 9162 section 2.1.3.2."""
+    if not 0 <= index < size:
+        return False
+    fn, sn, r = index, size - 1, leaf
+    for p in proof:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            r = node_hash(p, r)
+            if not fn & 1:
+                while True:
+                    fn >>= 1
+                    sn >>= 1
+                    if fn & 1 or fn == 0:
+                        break
+        else:
+            r = node_hash(r, p)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and r == root
+
+
+def verify_consistency(
+    old_size: int,
+    new_size: int,
+    old_root: bytes,
+    new_root: bytes,
+    proof: List[bytes]
+) -> bool:
+    """RFC 9162 section 2.1.4.2."""
+    if old_size > new_size:
+        return False
+    if old_size == new_size:
+        return not proof and old_root == new_root
+    if old_size == 0:
+        return not proof
+    if not proof:
+        return False
+
+    if old_size & (old_size - 1) == 0:
+        proof = [old_root] + list(proof)
+
+    fn, sn = old_size - 1, new_size - 1
+    while fn & 1:
+        fn >>= 1
+        sn >>= 1
+
+    fr = sr = proof[0]
+    for c in proof[1:]:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            fr = node_hash(c, fr)
+            sr = node_hash(c, sr)
+            if not fn & 1:
+                while True:
+                    fn >>= 1
+                    sn >>= 1
+                    if fn & 1 or fn == 0:
+                        break
+        else:
+            sr = node_hash(sr, c)
+        fn >>= 1
+        sn >>= 1
+
+    return sn == 0 and fr == old_root and sr == new_root
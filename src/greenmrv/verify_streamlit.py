@@ -1,96 +1,298 @@
+import hashlib
 import json
-from pathlib import Path
-from web3 import Web3
+import math
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
 import streamlit as st
 
-from greenmrv.integrity import compute_mrv_sha256
+from greenmrv.anchor_cache import AnchorCache, CachedAnchorBackend
+from greenmrv.anchoring import (
+    STATUS_NOT_FOUND,
+    STATUS_NOT_REGISTERED,
+    STATUS_TAMPERED,
+    STATUS_VALID,
+    TRANSPARENCY_LOG_NETWORK,
+    AnchorBackend,
+    backend_for_integrity,
+    verify_mrv_json,
+)
+from greenmrv.archive import MRVBundle, bundle_paths, load_mrv_json
+
+PAGE_SIZES = [25, 50, 100, 250]
+STATUS_LABELS = {
+    STATUS_VALID: "✅ VALID",
+    STATUS_TAMPERED: "❌ TAMPERED",
+    STATUS_NOT_FOUND: "⚠ NOT FOUND",
+    STATUS_NOT_REGISTERED: "⚠ NOT REGISTERED",
+}
+CONCLUSIVE = {STATUS_LABELS[STATUS_VALID], STATUS_LABELS[STATUS_TAMPERED], STATUS_LABELS[STATUS_NOT_REGISTERED]}
+
 
 # -------------------------------
-# Ganache Configuration
+# Open resources (shared across sessions)
 # -------------------------------
-GANACHE_RPC = "http://127.0.0.1:7545"
+class ResourcePool:
+    """
+    Open resources (backends, bundles) keyed by name.
+
+    A resource is reopened in place when its version changes, and the
+    least recently used ones are closed past max_entries, so a log that
+    keeps growing or a directory of many bundles does not pile up open
+    copies. Calls are serialized, so nothing is closed while in use.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._items: "OrderedDict[Any, Tuple[Any, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def call(self, key: Any, version: Any, open_fn: Callable[[], Any], fn: Callable[[Any], Any]) -> Any:
+        with self._lock:
+            item = self._items.pop(key, None)
+            if item is not None and item[0] != version:
+                item[1].close()
+                item = None
+            if item is None:
+                item = (version, open_fn())
+            self._items[key] = item
+            while len(self._items) > self.max_entries:
+                _, (_, old) = self._items.popitem(last=False)
+                old.close()
+            return fn(item[1])
+
+    def close(self) -> None:
+        with self._lock:
+            for _, resource in self._items.values():
+                resource.close()
+            self._items.clear()
+
+
+@st.cache_resource(show_spinner=False)
+def backend_pool() -> ResourcePool:
+    return ResourcePool(max_entries=16)
+
+
+@st.cache_resource(show_spinner=False)
+def bundle_pool() -> ResourcePool:
+    return ResourcePool(max_entries=32)
+
+
+@st.cache_resource(show_spinner=False)
+def get_anchor_cache(path: str) -> AnchorCache:
+    return AnchorCache(path)
+
+
+# -------------------------------
+# Cached chain access
+# -------------------------------
+def anchor_version(network: str, address: str) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of a transparency log, so appends to it reopen the log."""
+    if network == TRANSPARENCY_LOG_NETWORK and os.path.exists(address):
+        stat = os.stat(address)
+        return stat.st_mtime_ns, stat.st_size
+    return None
+
+
+def open_backend(network: str, address: str, cache_path: str) -> AnchorBackend:
+    # Web3 client + contract handle (or loaded log)
+    backend = backend_for_integrity({"blockchain_network": network, "contract_address": address})
+    if cache_path:
+        # Cached records are served without RPC; new ones are added on lookup
+        backend = CachedAnchorBackend(backend, get_anchor_cache(cache_path), confirm=False)
+    return backend
+
+
+class NotAnchored(LookupError):
+    pass
+
+
+@st.cache_data(show_spinner=False, ttl=600)
+def get_anchored_hash(network: str, address: str, mrv_id: str, cache_path: str, version: Any) -> str:
+    anchored = backend_pool().call(
+        (network, address, cache_path),
+        version,
+        lambda: open_backend(network, address, cache_path),
+        lambda backend: backend.lookup(mrv_id)
+    )
+    if anchored is None:
+        # Raised rather than returned: st.cache_data does not memoize errors,
+        # so a record anchored later is found on the next rerun
+        raise NotAnchored(mrv_id)
+    return anchored
+
+
+class SessionBackend(AnchorBackend):
+    """Read-only view of an anchor whose lookups go through the app caches."""
+
+    def __init__(self, network: str, address: str, cache_path: str = ""):
+        self.network = network
+        self._address = address
+        self.cache_path = cache_path
+
+    @property
+    def address(self) -> str:
+        return self._address
+
+    def anchor(self, mrv_id: str, sha256_hex: str) -> Dict[str, str]:
+        raise RuntimeError("The verifier is read-only")
+
+    def lookup(self, mrv_id: str) -> Optional[str]:
+        version = anchor_version(self.network, self._address)
+        try:
+            return get_anchored_hash(self.network, self._address, mrv_id, self.cache_path, version)
+        except NotAnchored:
+            return None
+
 
 # -------------------------------
-# Smart Contract ABI (minimal)
+# Record sources
 # -------------------------------
-MRV_REGISTRY_ABI = [
-    {
-        "inputs": [{"internalType": "string", "name": "mrvId", "type": "string"}],
-        "name": "getMRV",
-        "outputs": [
-            {"internalType": "bytes32", "name": "hash", "type": "bytes32"},
-            {"internalType": "uint256", "name": "timestamp", "type": "uint256"},
-            {"internalType": "address", "name": "submitter", "type": "address"},
-        ],
-        "stateMutability": "view",
-        "type": "function",
-    }
-]
-
-
-def get_onchain_hash(contract_address: str, mrv_id: str) -> bytes:
-    w3 = Web3(Web3.HTTPProvider(GANACHE_RPC))
-    if not w3.is_connected():
-        raise RuntimeError("Cannot connect to Ganache")
-
-    contract = w3.eth.contract(
-        address=Web3.to_checksum_address(contract_address),
-        abi=MRV_REGISTRY_ABI,
+# A ref is (label, path, mrv_id); mrv_id is None for loose JSON files.
+Ref = Tuple[str, str, Optional[str]]
+
+
+@st.cache_data(show_spinner=False)
+def list_directory(directory: str, mtime: float) -> List[Ref]:
+    refs: List[Ref] = []
+    for name in sorted(os.listdir(directory)):
+        if name.startswith("MRV-") and name.endswith(".json"):
+            refs.append((name, os.path.join(directory, name), None))
+    for path in bundle_paths(directory):
+        with MRVBundle(path) as b:
+            for mrv_id in b.ids():
+                refs.append((f"{os.path.basename(path)}#{mrv_id}", path, mrv_id))
+    return refs
+
+
+def load_ref(path: str, mrv_id: Optional[str]) -> Dict[str, Any]:
+    if mrv_id is None:
+        return load_mrv_json(path)
+    # Keeps the mmap and parsed offset index across reruns
+    return bundle_pool().call(
+        path,
+        os.stat(path).st_mtime_ns,
+        lambda: MRVBundle(path),
+        lambda bundle: bundle.read_json(mrv_id)
     )
 
-    hash_bytes, _, _ = contract.functions.getMRV(mrv_id).call()
-    return hash_bytes
+
+def verify_record(mrv_json: Dict[str, Any], cache_path: str = "") -> Dict[str, Any]:
+    integrity = mrv_json.get("integrity") or {}
+    address = integrity.get("contract_address")
+    backend = None
+    if address and address != "not_registered":
+        backend = SessionBackend(integrity.get("blockchain_network"), address, cache_path)
+
+    # Same status rules as `greenmrv verify`
+    result = verify_mrv_json(mrv_json, backend=backend)
+    return dict(result, status=STATUS_LABELS[result["status"]])
 
 
 # -------------------------------
 # Streamlit UI
 # -------------------------------
-st.set_page_config(page_title="MRV Verifier", layout="centered")
+st.set_page_config(page_title="MRV Verifier", layout="wide")
 
 st.title("🔍 Blockchain-Assisted MRV Verifier")
 st.write("Verify the integrity of ML emission reports using blockchain.")
 
-uploaded_file = st.file_uploader("Upload MRV JSON file", type=["json"])
-mrv_id = st.text_input("Enter MRV ID")
-
-if uploaded_file and mrv_id:
-    try:
-        mrv_json = json.load(uploaded_file)
-
-        # -------------------------------
-        # Recompute hash
-        # -------------------------------
-        recomputed_hash = compute_mrv_sha256(mrv_json)
-
-        st.subheader("Computed Hash")
-        st.code(recomputed_hash)
-
-        integrity = mrv_json.get("integrity", {})
-        contract_address = integrity.get("contract_address")
-
-        if not contract_address or contract_address == "not_registered":
-            st.error("No blockchain contract address found in MRV JSON.")
-            st.stop()
-
-        # -------------------------------
-        # Query blockchain
-        # -------------------------------
-        onchain_hash_bytes = get_onchain_hash(contract_address, mrv_id)
-        onchain_hash_hex = onchain_hash_bytes.hex()
-
-        st.subheader("On-chain Hash")
-        st.code(onchain_hash_hex)
-
-        # -------------------------------
-        # Compare
-        # -------------------------------
-        if recomputed_hash == onchain_hash_hex:
-            st.success("✅ VALID: MRV record is authentic and untampered.")
-        else:
-            st.error("❌ TAMPERED: MRV JSON does not match blockchain record.")
-
-    except Exception as e:
-        if "MRV not found" in str(e):
-            st.warning("⚠ NOT FOUND: MRV ID not registered on blockchain.")
-        else:
-            st.error(f"Verification failed: {e}")
+if "results" not in st.session_state:
+    st.session_state["results"] = {}
+results: Dict[str, Dict[str, Any]] = st.session_state["results"]
+
+with st.sidebar:
+    cache_path = st.text_input("Anchor cache file (optional)", help="Skips chain lookups for cached records.")
+    if st.button("Clear cached lookups"):
+        get_anchored_hash.clear()
+        backend_pool().close()
+        bundle_pool().close()
+        get_anchor_cache.clear()
+        list_directory.clear()
+        results.clear()
+
+source = st.radio("Records", ["Upload files", "Server directory"], horizontal=True)
+
+refs: List[Ref] = []
+uploads: Dict[str, Any] = {}
+
+if source == "Upload files":
+    files = st.file_uploader("Upload MRV JSON files", type=["json"], accept_multiple_files=True)
+    for f in files or []:
+        # Keyed by content, so a changed re-upload of the same name is verified again
+        key = "upload:" + hashlib.sha256(f.getvalue()).hexdigest()
+        uploads[key] = f
+        refs.append((f.name, key, None))
+else:
+    directory = st.text_input("Directory on the server", value=os.path.join(os.getcwd(), "mrv_records"))
+    if directory and os.path.isdir(directory):
+        refs = list_directory(directory, os.path.getmtime(directory))
+    elif directory:
+        st.error("Directory not found.")
+
+if refs:
+    # -------------------------------
+    # Paging: only the visible page is verified on each rerun; earlier
+    # results are kept in session state.
+    # -------------------------------
+    col1, col2 = st.columns(2)
+    page_size = col1.selectbox("Records per page", PAGE_SIZES, index=1)
+    pages = max(math.ceil(len(refs) / page_size), 1)
+    page = col2.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1)
+
+    versions: Dict[str, str] = {}
+
+    def result_key(ref: Ref) -> str:
+        # Results are reused only while the file is unchanged
+        path = ref[1]
+        if path not in versions:
+            if path in uploads:
+                versions[path] = ""
+            else:
+                stat = os.stat(path) if os.path.exists(path) else None
+                versions[path] = f"@{stat.st_mtime_ns}:{stat.st_size}" if stat else "@missing"
+        return path + "#" + str(ref[2]) + versions[path]
+
+    page_refs = refs[(page - 1) * page_size:page * page_size]
+    todo = [r for r in page_refs if result_key(r) not in results]
+
+    if todo:
+        progress = st.progress(0.0, text="Verifying...")
+        for i, ref in enumerate(todo):
+            label, path, mrv_id = ref
+            key = result_key(ref)
+            try:
+                if path in uploads:
+                    uploads[path].seek(0)
+                    mrv_json = json.load(uploads[path])
+                else:
+                    mrv_json = load_ref(path, mrv_id)
+                results[key] = verify_record(mrv_json, cache_path)
+            except Exception as e:
+                results[key] = {
+                    "mrv_id": mrv_id,
+                    "status": f"Verification failed: {e}",
+                    "computed_hash": None,
+                    "anchored_hash": None,
+                }
+            progress.progress((i + 1) / len(todo), text=f"Verifying {i + 1}/{len(todo)}")
+        progress.empty()
+
+    rows = [dict(results[result_key(r)], source=r[0]) for r in page_refs]
+    st.dataframe(rows, hide_index=True)
+
+    # Not-found and failed records are checked again on the next rerun
+    # (the anchor may have caught up)
+    for r in todo:
+        if results[result_key(r)]["status"] not in CONCLUSIVE:
+            del results[result_key(r)]
+
+    keys = (result_key(r) for r in refs)
+    verified = [results[k]["status"] for k in keys if k in results]
+    st.caption(
+        f"{len(refs)} records · {len(verified)} verified so far · "
+        f"{sum(s == STATUS_LABELS[STATUS_VALID] for s in verified)} valid · "
+        f"{sum(s == STATUS_LABELS[STATUS_TAMPERED] for s in verified)} tampered"
+    )
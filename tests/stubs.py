@@ -0,0 +1,77 @@
+"""Stand-ins for pynvml and CodeCarbon, so tests run without GPUs or codecarbon."""
+import os
+from types import SimpleNamespace
+
+
+class StubNvml:
+    """pynvml stand-in: devices with an energy counter, and one that only reports power."""
+
+    def __init__(self, num_devices=2, counter_devices=1):
+        self.num_devices = num_devices
+        self.counter_devices = counter_devices
+        self.energy_mj = [0] * num_devices
+        self.power_mw = 100_000
+        self.initialized = False
+        self.shutdowns = 0
+
+    def nvmlInit(self):
+        self.initialized = True
+
+    def nvmlShutdown(self):
+        self.initialized = False
+        self.shutdowns += 1
+
+    def nvmlDeviceGetCount(self):
+        return self.num_devices
+
+    def nvmlDeviceGetHandleByIndex(self, i):
+        return i
+
+    def nvmlDeviceGetName(self, h):
+        return b"Stub GPU"
+
+    def nvmlDeviceGetMemoryInfo(self, h):
+        return SimpleNamespace(total=16 * 1024 ** 3)
+
+    def nvmlDeviceGetPowerManagementLimit(self, h):
+        return 300_000
+
+    def nvmlDeviceGetTotalEnergyConsumption(self, h):
+        if h >= self.counter_devices:
+            raise RuntimeError("NVML_ERROR_NOT_SUPPORTED")
+        return self.energy_mj[h]
+
+    def nvmlDeviceGetPowerUsage(self, h):
+        return self.power_mw
+
+
+class FakeTracker:
+    """
+    codecarbon.EmissionsTracker stand-in. stop() writes the CSV row that
+    mrv_run parses; _total_energy mirrors the attribute live mode reads.
+    """
+
+    instances = []
+
+    def __init__(self, energy_kwh=0.002, co2_kg=0.001, **kwargs):
+        self.kwargs = kwargs
+        self.energy_kwh = energy_kwh
+        self.co2_kg = co2_kg
+        self._total_energy = SimpleNamespace(kWh=0.0)
+        self.running = False
+        FakeTracker.instances.append(self)
+
+    def start(self):
+        self.running = True
+
+    def stop(self):
+        self.running = False
+        out_dir, out_file = self.kwargs.get("output_dir"), self.kwargs.get("output_file")
+        if out_dir and out_file:
+            with open(os.path.join(out_dir, out_file), "w", encoding="utf-8") as f:
+                f.write(f"energy_consumed,emissions\n{self.energy_kwh},{self.co2_kg}\n")
+        return self.co2_kg
+
+
+def fake_codecarbon(tracker_cls=FakeTracker):
+    return SimpleNamespace(EmissionsTracker=tracker_cls)
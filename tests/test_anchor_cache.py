@@ -0,0 +1,176 @@
+import json
+
+import pytest
+
+from greenmrv import cli
+from greenmrv.anchor_cache import UNKNOWN_TX, AnchorCache, CachedAnchorBackend
+from greenmrv.anchoring import InMemoryBackend, TransparencyLogBackend
+from greenmrv.integrity import compute_mrv_sha256
+
+HASH_A = "a" * 64
+HASH_B = "b" * 64
+
+
+class CountingBackend(InMemoryBackend):
+    def __init__(self):
+        super().__init__()
+        self.anchors = 0
+        self.lookups = 0
+
+    def anchor(self, mrv_id, sha256_hex):
+        self.anchors += 1
+        return super().anchor(mrv_id, sha256_hex)
+
+    def lookup(self, mrv_id):
+        self.lookups += 1
+        return super().lookup(mrv_id)
+
+
+def test_cache_persists_across_reopen(tmp_path):
+    path = str(tmp_path / "anchors.jsonl")
+    cache = AnchorCache(path, capacity=4)
+    for i in range(10):  # grows past the requested capacity
+        cache.add("net", "0xABC", f"MRV-{i}", HASH_A, f"0x{i}")
+    cache.close()
+
+    cache = AnchorCache(path)
+    assert cache.get("net", "0xabc", "MRV-7")["tx_hash"] == "0x7"
+    assert cache.get("net", "0xabc", "MRV-99") is None
+    assert not cache.might_contain("other", "0xabc", "MRV-7")
+
+
+def test_add_after_torn_tail_starts_a_new_line(tmp_path):
+    path = tmp_path / "anchors.jsonl"
+    cache = AnchorCache(str(path))
+    cache.add("net", "0x1", "MRV-1", HASH_A, "0x1")
+    cache.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"key": "net|0x1|MRV-2", "mrv_')
+
+    cache = AnchorCache(str(path))
+    cache.add("net", "0x1", "MRV-3", HASH_B, "0x3")
+    cache.close()
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["mrv_id"] for line in lines] == ["MRV-1", "MRV-3"]
+    assert AnchorCache(str(path)).get("net", "0x1", "MRV-3")["hash"] == HASH_B
+
+
+def test_anchor_is_idempotent(tmp_path):
+    backend = CountingBackend()
+    cached = CachedAnchorBackend(backend, AnchorCache(str(tmp_path / "c.jsonl")), confirm=False)
+
+    first = cached.anchor("MRV-1", HASH_A)
+    assert cached.anchor("MRV-1", HASH_A) == first
+    assert backend.anchors == 1
+    assert backend.lookups == 0
+    with pytest.raises(ValueError, match="different hash"):
+        cached.anchor("MRV-1", HASH_B)
+
+
+def test_anchor_adopts_records_registered_before_the_cache(tmp_path):
+    backend = CountingBackend()
+    backend.anchor("MRV-1", HASH_A)
+    cached = CachedAnchorBackend(backend, AnchorCache(str(tmp_path / "c.jsonl")))
+
+    assert cached.anchor("MRV-1", HASH_A)["tx_hash"] == UNKNOWN_TX
+
+
+def test_lookup_skips_rpc_for_known_records(tmp_path):
+    backend = CountingBackend()
+    backend.anchor("MRV-1", HASH_A)
+    cached = CachedAnchorBackend(backend, AnchorCache(str(tmp_path / "c.jsonl")), confirm=False)
+
+    assert cached.lookup("MRV-1") == HASH_A  # unknown: asks the chain, then caches
+    assert cached.lookup("MRV-1") == HASH_A
+    assert cached.lookup("MRV-2") is None
+    assert backend.lookups == 2
+
+
+def test_lookup_confirms_hits_on_chain(tmp_path):
+    backend = CountingBackend()
+    cache = AnchorCache(str(tmp_path / "c.jsonl"))
+    cached = CachedAnchorBackend(backend, cache, confirm=True)
+    cache.add(backend.network, backend.address, "MRV-1", HASH_A, "0x1")
+
+    # The chain was reset: a confirmed lookup does not trust the cache
+    assert cached.lookup("MRV-1") is None
+    assert backend.lookups == 1
+
+
+def _write_records(directory, log_path, n):
+    backend = TransparencyLogBackend(str(log_path))
+    for i in range(n):
+        rec = {"mrv_id": f"MRV-{i}", "energy_emissions": {"energy_kwh": i}, "integrity": {}}
+        rec["integrity"].update(backend.anchor(rec["mrv_id"], compute_mrv_sha256(rec)))
+        (directory / f"MRV-{i}.json").write_text(json.dumps(rec), encoding="utf-8")
+    backend.close()
+
+
+def test_cli_verify_with_cache(tmp_path, monkeypatch, capsys):
+    records = tmp_path / "records"
+    records.mkdir()
+    _write_records(records, tmp_path / "t.log", 3)
+    cache_path = str(tmp_path / "anchors.jsonl")
+
+    calls = []
+    lookup = TransparencyLogBackend.lookup
+    monkeypatch.setattr(TransparencyLogBackend, "lookup", lambda self, i: calls.append(i) or lookup(self, i))
+
+    assert cli.main(["verify", str(records), "--cache", cache_path]) == 0
+    assert len(calls) == 3
+    assert cli.main(["verify", str(records), "--cache", cache_path]) == 0
+    assert len(calls) == 3
+    assert cli.main(["verify", str(records), "--cache", cache_path, "--confirm"]) == 0
+    assert len(calls) == 6
+    assert capsys.readouterr().out.count("VALID") == 9
+
+
+@pytest.mark.parametrize("line", ['not json\n', '{"mrv_id": "MRV-2"}\n'])
+def test_corrupt_middle_line_raises(tmp_path, line):
+    path = tmp_path / "anchors.jsonl"
+    cache = AnchorCache(str(path))
+    for i in range(3):
+        cache.add("net", "0x1", f"MRV-{i}", HASH_A, "0x1")
+    cache.close()
+    lines = path.read_text(encoding="utf-8").splitlines(keepends=True)
+    lines[1] = line
+    path.write_text("".join(lines), encoding="utf-8")
+
+    with pytest.raises(ValueError, match="line 2"):
+        AnchorCache(str(path)).get("net", "0x1", "MRV-0")
+
+
+def test_entries_added_before_first_load_are_found(tmp_path):
+    path = str(tmp_path / "anchors.jsonl")
+    AnchorCache(path).close()
+    cache = AnchorCache(path)
+    cache.add("net", "0x1", "MRV-1", HASH_A, "0x1")
+    assert cache.get("net", "0x1", "MRV-1")["hash"] == HASH_A
+
+
+def test_confirmed_anchor_replaces_stale_entry_with_different_hash(tmp_path):
+    backend = CountingBackend()
+    cache = AnchorCache(str(tmp_path / "c.jsonl"))
+    cached = CachedAnchorBackend(backend, cache, confirm=True)
+    cached.anchor("MRV-1", HASH_A)
+
+    backend.records.clear()  # the chain was reset
+    anchored = cached.anchor("MRV-1", HASH_B)
+    assert backend.records == {"MRV-1": HASH_B}
+    assert cache.get(backend.network, backend.address, "MRV-1")["tx_hash"] == anchored["tx_hash"]
+
+    # The chain disagrees: still refused
+    with pytest.raises(ValueError, match="different hash"):
+        cached.anchor("MRV-1", HASH_A)
+
+
+def test_unconfirmed_anchor_trusts_a_different_cached_hash(tmp_path):
+    backend = CountingBackend()
+    cached = CachedAnchorBackend(backend, AnchorCache(str(tmp_path / "c.jsonl")), confirm=False)
+    cached.anchor("MRV-1", HASH_A)
+    backend.records.clear()
+
+    with pytest.raises(ValueError, match="different hash"):
+        cached.anchor("MRV-1", HASH_B)
+    assert backend.lookups == 0
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from greenmrv.archive import (
+    ZSTD_DICT_MIN_RECORDS,
+    MRVBundle,
+    archive_records,
+    bundle_paths,
+    load_mrv_json,
+    write_bundle,
+)
+
+
+def _write_record(directory, i):
+    rec = {"mrv_id": f"MRV-{i}", "timestamps": {"end_time": "2020-01-01T00:00:00Z"}, "n": i}
+    (directory / f"MRV-{i}.json").write_text(json.dumps(rec), encoding="utf-8")
+    return rec
+
+
+@pytest.mark.parametrize("codec", ["zstd", "zlib"])
+def test_bundle_round_trip(tmp_path, codec):
+    if codec == "zstd":
+        pytest.importorskip("zstandard")
+    path = str(tmp_path / "b.mrvb")
+    records = [
+        (f"MRV-{i}", json.dumps({"mrv_id": f"MRV-{i}", "energy_kwh": i / 7}).encode(), b"csv" if i % 2 else None)
+        for i in range(ZSTD_DICT_MIN_RECORDS + 8)
+    ]
+    index = write_bundle(path, records, codec=codec)
+    if codec == "zstd":
+        # Real bundles are large enough to train a shared dictionary
+        assert index["dict"] is not None
+    else:
+        assert index["dict"] is None
+
+    with MRVBundle(path) as b:
+        assert list(b.ids()) == [r[0] for r in records]
+        for mrv_id, raw, csv_bytes in records:
+            assert b.read_json_bytes(mrv_id) == raw
+            assert b.read_csv(mrv_id) == csv_bytes
+
+
+def test_write_bundle_refuses_to_overwrite(tmp_path):
+    path = tmp_path / "b.mrvb"
+    write_bundle(str(path), [("MRV-1", b"{}", None)], codec="zlib")
+    before = path.read_bytes()
+
+    with pytest.raises(FileExistsError):
+        write_bundle(str(path), [("MRV-2", b"{}", None)], codec="zlib")
+    assert path.read_bytes() == before
+    assert [p.name for p in tmp_path.iterdir()] == ["b.mrvb"]
+
+
+def test_back_to_back_archives_keep_every_bundle(tmp_path):
+    _write_record(tmp_path, 1)
+    first = archive_records(str(tmp_path), older_than_days=0, codec="zlib")
+    _write_record(tmp_path, 2)
+    second = archive_records(str(tmp_path), older_than_days=0, codec="zlib")
+
+    assert len(first) == len(second) == 1
+    assert first != second
+    assert bundle_paths(str(tmp_path)) == sorted(first + second)
+    assert load_mrv_json(str(tmp_path), "MRV-1")["n"] == 1
+    assert load_mrv_json(str(tmp_path), "MRV-2")["n"] == 2
+
+
+def test_archive_skips_unparsable_end_times(tmp_path):
+    for i, end_time in enumerate([None, "garbage", 12]):
+        rec = {"mrv_id": f"MRV-{i}", "timestamps": {"end_time": end_time}}
+        (tmp_path / f"MRV-{i}.json").write_text(json.dumps(rec), encoding="utf-8")
+    (tmp_path / "MRV-3.json").write_text(json.dumps({"mrv_id": "MRV-3", "timestamps": None}), encoding="utf-8")
+
+    # Falls back to the file mtime, which is newer than the cutoff
+    assert archive_records(str(tmp_path), older_than_days=1, codec="zlib") == []
+    written = archive_records(str(tmp_path), older_than_days=-1, codec="zlib")
+    with MRVBundle(written[0]) as b:
+        assert sorted(b.ids()) == ["MRV-0", "MRV-1", "MRV-2", "MRV-3"]
@@ -0,0 +1,95 @@
+import json
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from greenmrv.carbon_intensity import (  # noqa: E402
+    load_intensity_table,
+    recompute_co2,
+    recompute_co2_for_dir,
+    write_intensity_table,
+)
+
+
+@pytest.fixture
+def table(tmp_path):
+    # Two regions, three hours from 2024-01-01T00:00Z
+    write_intensity_table(
+        str(tmp_path / "ci"),
+        regions=["DE", "FR"],
+        start_time="2024-01-01T00:00:00Z",
+        values=[[0.4, 0.2, 0.3], [0.1, 0.1, float("nan")]],
+        version="test",
+    )
+    return load_intensity_table(str(tmp_path / "ci"))
+
+
+def _record(start, end, energy=1.0, region="DE", mrv_id="MRV-1"):
+    return {
+        "mrv_id": mrv_id,
+        "energy_emissions": {"energy_kwh": energy},
+        "timestamps": {"start_time": start, "end_time": end},
+        "hardware": {"region": region},
+    }
+
+
+def test_run_within_one_hour(table):
+    co2 = recompute_co2([_record("2024-01-01T00:10:00Z", "2024-01-01T00:40:00Z")], table)
+    assert co2[0] == pytest.approx(0.4)
+
+
+def test_run_spanning_an_hour_boundary(table):
+    # 1 kWh spread over 00:30-01:30: half at 0.4, half at 0.2
+    co2 = recompute_co2([_record("2024-01-01T00:30:00Z", "2024-01-01T01:30:00Z")], table)
+    assert co2[0] == pytest.approx(0.3)
+
+
+def test_run_ending_on_an_hour_boundary(table):
+    co2 = recompute_co2([_record("2024-01-01T00:00:00Z", "2024-01-01T01:00:00Z")], table)
+    assert co2[0] == pytest.approx(0.4)
+
+
+def test_missing_intensity_is_nan(table):
+    co2 = recompute_co2([
+        _record("2024-01-01T00:10:00Z", "2024-01-01T00:20:00Z", region="XX"),
+        _record("2024-01-01T02:10:00Z", "2024-01-01T02:20:00Z", region="FR"),
+        _record("2024-01-01T05:10:00Z", "2024-01-01T05:20:00Z"),
+    ], table)
+    assert all(math.isnan(x) for x in co2)
+
+
+def test_empty(table):
+    co2 = recompute_co2([], table)
+    assert co2.shape == (0,)
+    assert co2.dtype == np.float64
+
+
+def test_malformed_records_do_not_abort_the_batch(table):
+    good = _record("2024-01-01T00:10:00Z", "2024-01-01T00:40:00Z")
+    bad = [
+        _record("2024-01-01T00:10:00Z", "garbage"),
+        _record("2024-01-01T00:10:00Z", None),
+        _record(None, "2024-01-01T00:40:00Z"),
+        dict(good, hardware="DE"),
+        dict(good, hardware={"region": ["DE"]}),
+        dict(good, energy_emissions=None),
+        {"mrv_id": "MRV-x"},
+    ]
+    co2 = recompute_co2([good] + bad + [good], table)
+    assert co2[0] == co2[-1] == pytest.approx(0.4)
+    assert all(math.isnan(x) for x in co2[1:-1])
+
+
+def test_recompute_for_dir_reports_bad_records(tmp_path, table):
+    out = tmp_path / "records"
+    out.mkdir()
+    (out / "MRV-1.json").write_text(json.dumps(_record("2024-01-01T00:10:00Z", "2024-01-01T00:40:00Z")))
+    (out / "MRV-2.json").write_text(json.dumps(_record("2024-01-01T00:10:00Z", "garbage", mrv_id="MRV-2")))
+
+    result = recompute_co2_for_dir(str(out), table.table_dir)
+    assert result == {"records": 2, "updated": 1, "missing": ["MRV-2"]}
+    derived = json.loads((out / "MRV-1.json").read_text())["derived"]["co2_recomputed"]
+    assert derived["co2_kg"] == pytest.approx(0.4)
+    assert derived["intensity_table_version"] == "test"
@@ -0,0 +1,108 @@
+import sys
+
+import pytest
+
+from greenmrv import core
+from greenmrv.anchoring import InMemoryBackend
+from greenmrv.hardware import MJ_PER_KWH, NvmlSession, detect_hardware, open_nvml
+
+from stubs import FakeTracker, StubNvml, fake_codecarbon
+
+
+def test_devices():
+    nvml = StubNvml()
+    session = NvmlSession(nvml)
+    gpus = session.devices()
+    session.close()
+
+    assert [g["index"] for g in gpus] == [0, 1]
+    assert gpus[0] == {"index": 0, "name": "Stub GPU", "memory_total_mb": 16384, "power_limit_w": 300.0}
+    assert nvml.shutdowns == 1
+
+
+def test_open_nvml_without_gpus():
+    nvml = StubNvml(num_devices=0)
+    assert open_nvml(nvml) is None
+    assert nvml.shutdowns == 1
+
+
+def test_energy_counter_and_power_polling(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("greenmrv.hardware.time.monotonic", lambda: clock[0])
+
+    nvml = StubNvml()
+    nvml.energy_mj[0] = 5_000
+    session = NvmlSession(nvml, interval_s=3600)
+    session.start_sampling()
+
+    nvml.energy_mj[0] = 5_000 + MJ_PER_KWH // 1000
+    clock[0] += 10.0
+    result = session.stop()
+
+    assert result[0] == {"index": 0, "energy_kwh": pytest.approx(0.001), "method": "energy_counter"}
+    # 100 W for 10 s
+    assert result[1]["method"] == "power_polling"
+    assert result[1]["energy_kwh"] == pytest.approx(100 * 10 / 3.6e6)
+    assert nvml.shutdowns == 1
+
+
+def test_detect_hardware_keeps_caller_session_open():
+    nvml = StubNvml()
+    session = NvmlSession(nvml)
+    hw = detect_hardware(region="test", nvml_session=session)
+
+    assert hw["num_gpus"] == 2
+    assert hw["gpu_type"] == "Stub GPU"
+    assert nvml.initialized
+    session.close()
+
+
+def _failing_backend():
+    raise RuntimeError("chain unavailable")
+
+
+def test_mrv_run_releases_nvml_when_backend_fails(monkeypatch, tmp_path):
+    monkeypatch.setitem(sys.modules, "codecarbon", fake_codecarbon())
+    monkeypatch.setattr(core, "GanacheBackend", _failing_backend)
+    nvml = StubNvml()
+    monkeypatch.setattr(core, "open_nvml", lambda: NvmlSession(nvml))
+
+    with pytest.raises(RuntimeError, match="chain unavailable"):
+        with core.mrv_run(out_dir=str(tmp_path)):
+            pass
+
+    assert nvml.shutdowns == 1
+
+
+def test_mrv_run_releases_nvml_when_tracker_fails(monkeypatch, tmp_path):
+    class FailingTracker(FakeTracker):
+        def start(self):
+            raise RuntimeError("tracker unavailable")
+
+    monkeypatch.setitem(sys.modules, "codecarbon", fake_codecarbon(FailingTracker))
+    nvml = StubNvml()
+    monkeypatch.setattr(core, "open_nvml", lambda: NvmlSession(nvml))
+
+    with pytest.raises(RuntimeError, match="tracker unavailable"):
+        with core.mrv_run(out_dir=str(tmp_path), anchor_backend=InMemoryBackend()):
+            pass
+
+    assert nvml.shutdowns == 1
+
+
+def test_mrv_run_stops_tracker_when_live_monitor_fails(monkeypatch, tmp_path):
+    def failing_monitor(*args, **kwargs):
+        raise FileExistsError("shm already exists")
+
+    FakeTracker.instances.clear()
+    monkeypatch.setitem(sys.modules, "codecarbon", fake_codecarbon())
+    monkeypatch.setattr(core, "LiveMonitor", failing_monitor)
+    nvml = StubNvml()
+    monkeypatch.setattr(core, "open_nvml", lambda: NvmlSession(nvml, interval_s=0.01))
+
+    with pytest.raises(FileExistsError):
+        with core.mrv_run(out_dir=str(tmp_path), anchor_backend=InMemoryBackend(), live=True):
+            pass
+
+    assert not FakeTracker.instances[0].running
+    assert nvml.shutdowns == 1
@@ -0,0 +1,130 @@
+import sys
+import uuid
+import warnings
+from types import SimpleNamespace
+
+import pytest
+
+from greenmrv import core, live
+from greenmrv.anchoring import InMemoryBackend
+from greenmrv.live import EnergyBudgetExceeded, LiveMonitor, LiveSnapshotReader, read_tracker_energy_kwh
+
+from stubs import FakeTracker, fake_codecarbon
+
+
+def _tracker(kwh=0.0):
+    return SimpleNamespace(_total_energy=SimpleNamespace(kWh=kwh))
+
+
+def test_rates_between_distinct_readings():
+    tracker = _tracker()
+    monitor = LiveMonitor(tracker, total_steps=10)
+
+    monitor.step(samples=10)
+    snap = monitor.step(samples=10)
+    assert snap["energy_kwh"] == 0.0
+    assert snap["energy_per_step_kwh"] != snap["energy_per_step_kwh"]  # NaN until the tracker moves
+
+    tracker._total_energy.kWh = 0.003
+    snap = monitor.step(samples=10)
+    assert snap["energy_per_step_kwh"] == pytest.approx(0.001)
+    assert snap["samples_per_joule"] == pytest.approx(30 / (0.003 * 3.6e6))
+    assert snap["projected_total_kwh"] == pytest.approx(0.010)
+
+    # Same reading: energy is extrapolated from the last rate
+    monitor.step(samples=10)
+    snap = monitor.step(samples=10)
+    assert snap["energy_kwh"] == pytest.approx(0.005)
+    assert snap["projected_total_kwh"] == pytest.approx(0.010)
+
+    # Next reading: the rate covers only the steps since the last one
+    tracker._total_energy.kWh = 0.009
+    snap = monitor.step(samples=20)
+    assert snap["energy_per_step_kwh"] == pytest.approx(0.002)
+    assert snap["samples_per_joule"] == pytest.approx(40 / (0.006 * 3.6e6))
+    assert snap["energy_kwh"] == pytest.approx(0.009)
+    assert snap["projected_total_kwh"] == pytest.approx(0.009 + 0.002 * 4)
+    assert snap["steps"] == 6.0 and snap["samples"] == 70.0
+
+
+def test_budget_callback_runs_once():
+    tracker = _tracker()
+    calls = []
+    monitor = LiveMonitor(tracker, energy_budget_kwh=0.0015, on_budget_exceeded=calls.append)
+
+    tracker._total_energy.kWh = 0.001
+    monitor.step()
+    monitor.step()  # extrapolated to 0.002
+    monitor.step()
+
+    assert len(calls) == 1
+    assert calls[0]["energy_kwh"] == pytest.approx(0.002)
+    assert calls[0]["budget_exceeded"] == 1.0
+    assert monitor.budget_exceeded
+
+
+def test_budget_without_callback_raises():
+    tracker = _tracker(0.002)
+    monitor = LiveMonitor(tracker, energy_budget_kwh=0.001)
+    with pytest.raises(EnergyBudgetExceeded):
+        monitor.step()
+
+
+def test_budget_stops_mrv_run_early(tmp_path, monkeypatch):
+    class MeteredTracker(FakeTracker):
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self._total_energy.kWh = 0.002
+
+    monkeypatch.setitem(sys.modules, "codecarbon", fake_codecarbon(MeteredTracker))
+    monkeypatch.setattr(core, "open_nvml", lambda: None)
+
+    steps = 0
+    with core.mrv_run(
+        out_dir=str(tmp_path),
+        anchor_backend=InMemoryBackend(),
+        energy_budget_kwh=0.001
+    ) as info:
+        for _ in range(100):
+            info["live"].step(samples=4)
+            steps += 1
+
+    assert steps == 0  # the first step already exceeded the budget
+    assert info["budget_exceeded"]
+    assert info["json_path"] is not None
+    assert info["mrv_json"]["training"]["num_samples"] == 4
+
+
+def test_snapshot_round_trip_through_shared_memory():
+    name = "gmrv_t" + uuid.uuid4().hex[:10]
+    tracker = _tracker()
+    monitor = LiveMonitor(tracker, total_steps=4, energy_budget_kwh=1.0, shm_name=name)
+    reader = LiveSnapshotReader(name)
+    try:
+        assert reader.read()["steps"] == 0.0
+
+        tracker._total_energy.kWh = 0.004
+        snap = monitor.step(samples=8)
+        read = reader.read()
+        assert read.keys() == snap.keys()
+        for key in ("steps", "samples", "energy_kwh", "energy_per_step_kwh", "projected_total_kwh", "budget_kwh"):
+            assert read[key] == pytest.approx(snap[key])
+
+        # A writer caught mid-update (odd seq) is never read
+        live._SEQ.pack_into(monitor._shm.buf, 0, monitor._seq + 1)
+        assert reader.read(max_retries=10) is None
+    finally:
+        reader.close()
+        monitor.close()
+
+
+def test_missing_total_energy_warns_once(monkeypatch):
+    monkeypatch.setattr(live, "_warned_no_total_energy", False)
+    with pytest.warns(RuntimeWarning, match="_total_energy"):
+        assert read_tracker_energy_kwh(object()) is None
+
+    monitor = LiveMonitor(object())
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        snap = monitor.step()
+    assert snap["energy_per_step_kwh"] != snap["energy_per_step_kwh"]
@@ -0,0 +1,60 @@
+import json
+
+from greenmrv import cli
+from greenmrv.regression import STATUS_REGRESSION, build_baseline_index, compare_latest
+
+
+def _write_run(directory, i, energy_kwh):
+    rec = {
+        "mrv_id": f"MRV-{i:03d}",
+        "experiment": {"experiment_name": "exp", "model_name": "m"},
+        "hardware": {"gpu_type": "A100", "num_gpus": 1, "cpu_type": "x86"},
+        "training": {"epochs": 10, "num_samples": 1000},
+        "energy_emissions": {"energy_kwh": energy_kwh},
+        "timestamps": {"end_time": f"2024-01-01T00:{i:02d}:00Z"},
+    }
+    (directory / f"MRV-{i:03d}.json").write_text(json.dumps(rec), encoding="utf-8")
+
+
+def test_latest_run_regression(tmp_path):
+    for i, e in enumerate([1.0, 1.02, 0.98, 1.01, 0.99]):
+        _write_run(tmp_path, i, e)
+    _write_run(tmp_path, 5, 1.5)
+
+    findings = compare_latest(build_baseline_index(str(tmp_path)))
+    assert {f["metric"] for f in findings} == {"energy_per_epoch_kwh", "energy_per_sample_kwh"}
+    assert all(f["status"] == STATUS_REGRESSION and f["mrv_id"] == "MRV-005" for f in findings)
+
+
+def test_index_in_new_directory(tmp_path):
+    _write_run(tmp_path, 0, 1.0)
+    index_path = tmp_path / "ci" / "cache" / "index.json"
+    build_baseline_index(str(tmp_path), str(index_path))
+    assert index_path.exists()
+
+
+def test_compare_missing_out_dir(tmp_path, capsys):
+    assert cli.main(["compare", "--out-dir", str(tmp_path / "missing")]) == 2
+    assert "Records directory not found" in capsys.readouterr().err
+
+
+def test_malformed_records_are_skipped(tmp_path, capsys):
+    for i, e in enumerate([1.0, 1.02, 0.98, 1.01]):
+        _write_run(tmp_path, i, e)
+    for i, section in enumerate(["training", "experiment", "energy_emissions", "hardware", "timestamps"]):
+        _write_run(tmp_path, 10 + i, 1.0)
+        path = tmp_path / f"MRV-{10 + i:03d}.json"
+        rec = json.loads(path.read_text())
+        rec[section] = None
+        path.write_text(json.dumps(rec))
+    (tmp_path / "MRV-020.json").write_text("[]")
+    (tmp_path / "MRV-021.json").write_text("{not json")
+    _write_run(tmp_path, 30, 1.5)
+
+    index = build_baseline_index(str(tmp_path))
+    ids = {r["mrv_id"] for rows in index["groups"].values() for r in rows}
+    assert "MRV-012" not in ids  # no energy
+    assert "MRV-030" in ids
+
+    assert cli.main(["compare", "--out-dir", str(tmp_path), "--id", "MRV-030"]) == 1
+    assert "REGRESSION\tMRV-030" in capsys.readouterr().out
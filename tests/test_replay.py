@@ -0,0 +1,81 @@
+import sys
+
+import pytest
+
+from greenmrv import core
+from greenmrv.anchoring import InMemoryBackend
+from greenmrv.hardware import NvmlSession
+from greenmrv.replay import MRVFixture
+
+from stubs import StubNvml, fake_codecarbon
+
+META = {"experiment_name": "replay", "model_name": "m", "dataset_name": "d", "epochs": 2, "batch_size": 8}
+
+
+def _record(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "codecarbon", fake_codecarbon())
+    monkeypatch.setattr(core, "open_nvml", lambda: NvmlSession(StubNvml(), interval_s=0.01))
+    fixture_path = str(tmp_path / "run.fixture.json")
+    with core.mrv_run(
+        out_dir=str(tmp_path / "recorded"),
+        anchor_backend=InMemoryBackend(),
+        fixture=MRVFixture.record(fixture_path),
+        **META
+    ) as info:
+        pass
+    return fixture_path, info
+
+
+def _no_live_inputs(monkeypatch):
+    # Replay must not touch CodeCarbon, NVML or a chain
+    monkeypatch.setitem(sys.modules, "codecarbon", None)
+
+    def forbidden(*args, **kwargs):
+        raise AssertionError("replay used a live input")
+
+    monkeypatch.setattr(core, "open_nvml", forbidden)
+    monkeypatch.setattr(core, "GanacheBackend", forbidden)
+    monkeypatch.setattr(core, "detect_hardware", forbidden)
+
+
+def test_replay_is_byte_identical(tmp_path, monkeypatch):
+    fixture_path, recorded = _record(tmp_path, monkeypatch)
+    _no_live_inputs(monkeypatch)
+
+    with core.mrv_run(out_dir=str(tmp_path / "replayed"), fixture=MRVFixture.replay(fixture_path), **META) as info:
+        pass
+
+    with open(recorded["json_path"], "rb") as f:
+        expected = f.read()
+    with open(info["json_path"], "rb") as f:
+        assert f.read() == expected
+    assert info["mrv_json"]["energy_emissions"]["energy_kwh"] == 0.002
+    assert len(info["mrv_json"]["hardware"]["gpus"]) == 2
+
+
+def test_replay_with_changed_metadata_diverges(tmp_path, monkeypatch):
+    fixture_path, _ = _record(tmp_path, monkeypatch)
+    _no_live_inputs(monkeypatch)
+
+    with pytest.raises(RuntimeError, match="Replay diverged"):
+        with core.mrv_run(
+            out_dir=str(tmp_path / "replayed"),
+            fixture=MRVFixture.replay(fixture_path),
+            **dict(META, model_name="other")
+        ):
+            pass
+
+
+def test_replay_ignores_a_passed_backend(tmp_path, monkeypatch):
+    fixture_path, _ = _record(tmp_path, monkeypatch)
+    _no_live_inputs(monkeypatch)
+    backend = InMemoryBackend()
+
+    with core.mrv_run(
+        out_dir=str(tmp_path / "replayed"),
+        anchor_backend=backend,
+        fixture=MRVFixture.replay(fixture_path),
+        **META
+    ):
+        pass
+    assert backend.records == {}
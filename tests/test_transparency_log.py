@@ -0,0 +1,135 @@
+import hashlib
+
+import pytest
+
+from greenmrv.transparency_log import (
+    TransparencyLog,
+    leaf_hash,
+    node_hash,
+    verify_consistency,
+    verify_inclusion,
+)
+
+
+def _sha(i):
+    return hashlib.sha256(str(i).encode()).hexdigest()
+
+
+def _reference_root(leaves):
+    """RFC 6962 MTH computed directly from the definition."""
+    n = len(leaves)
+    if n == 0:
+        return hashlib.sha256(b"").digest()
+    if n == 1:
+        return leaves[0]
+    k = 1
+    while k * 2 < n:
+        k *= 2
+    return node_hash(_reference_root(leaves[:k]), _reference_root(leaves[k:]))
+
+
+def _fill(path, n, **kwargs):
+    log = TransparencyLog(str(path), **kwargs)
+    for i in range(n):
+        log.append(f"MRV-{i}", _sha(i))
+    return log
+
+
+def test_append_and_reopen(tmp_path):
+    path = tmp_path / "t.log"
+    with _fill(path, 5) as log:
+        root = log.root()
+        entry = log.get("MRV-3")
+
+    reopened = TransparencyLog(str(path))
+    assert reopened.size == 5
+    assert reopened.root() == root
+    assert reopened.get("MRV-3") == entry
+    with pytest.raises(ValueError, match="already registered"):
+        reopened.append("MRV-3", _sha(3))
+
+
+def test_root_matches_reference(tmp_path):
+    log = _fill(tmp_path / "t.log", 37)
+    leaves = [leaf_hash(f"MRV-{i}", _sha(i)) for i in range(37)]
+    for size in range(38):
+        assert log.root(size) == _reference_root(leaves[:size])
+    log.close()
+
+
+def test_inclusion_proofs(tmp_path):
+    log = _fill(tmp_path / "t.log", 21)
+    for size in range(1, 22):
+        root = log.root(size)
+        for index in range(size):
+            leaf = leaf_hash(f"MRV-{index}", _sha(index))
+            proof = log.inclusion_proof(index, size)
+            assert verify_inclusion(leaf, index, size, root, proof)
+            assert not verify_inclusion(leaf, index, size, root, proof[:-1] if proof else [root])
+            other = leaf_hash("MRV-x", _sha(index))
+            assert not verify_inclusion(other, index, size, root, proof)
+    log.close()
+
+
+def test_consistency_proofs(tmp_path):
+    log = _fill(tmp_path / "t.log", 21)
+    for new_size in range(1, 22):
+        new_root = log.root(new_size)
+        for old_size in range(1, new_size + 1):
+            old_root = log.root(old_size)
+            proof = log.consistency_proof(old_size, new_size)
+            assert verify_consistency(old_size, new_size, old_root, new_root, proof)
+            if old_size < new_size:
+                assert not verify_consistency(old_size, new_size, new_root, new_root, proof)
+    log.close()
+
+
+def test_torn_tail_is_dropped_and_truncated_on_append(tmp_path):
+    path = tmp_path / "t.log"
+    _fill(path, 3).close()
+    good = path.read_bytes()
+    with open(path, "ab") as f:
+        f.write(b'{"i":3,"id":"MRV-3","h":"ab')
+
+    log = TransparencyLog(str(path))
+    assert log.size == 3
+    assert path.read_bytes() != good  # opening never writes
+
+    log.append("MRV-3", _sha(3))
+    log.close()
+    assert path.read_bytes().startswith(good)
+    assert TransparencyLog(str(path)).size == 4
+
+
+@pytest.mark.parametrize("line", [
+    b"not json\n",
+    b'{"i":1,"id":"MRV-1"}\n',
+    b'{"i":7,"id":"MRV-1","h":"' + _sha(1).encode() + b'","c":"00"}\n',
+    b'{"i":1,"id":"MRV-1","h":"' + _sha(1).encode() + b'","c":"00"}\n',
+])
+def test_corrupt_middle_raises(tmp_path, line):
+    path = tmp_path / "t.log"
+    _fill(path, 3).close()
+    lines = path.read_bytes().splitlines(keepends=True)
+    lines[1] = line
+    path.write_bytes(b"".join(lines))
+    before = path.read_bytes()
+
+    with pytest.raises(ValueError):
+        TransparencyLog(str(path))
+    assert path.read_bytes() == before
+
+
+def test_append_refuses_to_truncate_entries_added_since_open(tmp_path):
+    path = tmp_path / "t.log"
+    _fill(path, 2).close()
+    stale = TransparencyLog(str(path))
+
+    writer = TransparencyLog(str(path))
+    writer.append("MRV-2", _sha(2))
+    writer.close()
+    before = path.read_bytes()
+
+    with pytest.raises(ValueError, match="changed since it was opened"):
+        stale.append("MRV-3", _sha(3))
+    assert path.read_bytes() == before
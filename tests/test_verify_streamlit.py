@@ -0,0 +1,88 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("streamlit")
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from greenmrv import anchoring  # noqa: E402
+from greenmrv.anchoring import InMemoryBackend, TransparencyLogBackend  # noqa: E402
+from greenmrv.integrity import compute_mrv_sha256  # noqa: E402
+
+APP = os.path.join(os.path.dirname(__file__), "..", "src", "greenmrv", "verify_streamlit.py")
+
+
+def _record(i, log_path):
+    rec = {"mrv_id": f"MRV-{i}", "energy_emissions": {"energy_kwh": i}}
+    rec["integrity"] = {
+        "blockchain_network": "transparency-log",
+        "contract_address": os.path.abspath(log_path),
+    }
+    return rec
+
+
+def _statuses(at):
+    return dict(zip(at.dataframe[0].value["mrv_id"], at.dataframe[0].value["status"]))
+
+
+def _app(directory):
+    at = AppTest.from_file(APP, default_timeout=30)
+    at.run()
+    at.radio[0].set_value("Server directory")
+    at.run()
+    next(t for t in at.text_input if t.label == "Directory on the server").set_value(str(directory))
+    return at.run()
+
+
+def test_directory_results_follow_file_and_log_changes(tmp_path):
+    log_path = tmp_path / "t.log"
+    records = tmp_path / "records"
+    records.mkdir()
+
+    backend = TransparencyLogBackend(str(log_path))
+    first = _record(1, log_path)
+    backend.anchor("MRV-1", compute_mrv_sha256(first))
+    backend.close()
+    (records / "MRV-1.json").write_text(json.dumps(first), encoding="utf-8")
+    second = _record(2, log_path)
+    (records / "MRV-2.json").write_text(json.dumps(second), encoding="utf-8")
+
+    at = _app(records)
+    assert not at.exception
+    statuses = _statuses(at)
+    assert "VALID" in statuses["MRV-1"]
+    assert "NOT FOUND" in statuses["MRV-2"]
+
+    # Anchored after the first check: the reopened log must see it
+    backend = TransparencyLogBackend(str(log_path))
+    backend.anchor("MRV-2", compute_mrv_sha256(second))
+    backend.close()
+    # Tampered in place: the cached VALID must not be reused
+    first["energy_emissions"]["energy_kwh"] = 100
+    (records / "MRV-1.json").write_text(json.dumps(first), encoding="utf-8")
+
+    at.run()
+    statuses = _statuses(at)
+    assert "TAMPERED" in statuses["MRV-1"]
+    assert "VALID" in statuses["MRV-2"]
+
+
+def test_not_found_is_not_memoized(tmp_path, monkeypatch):
+    chain = InMemoryBackend()
+    # Stands in for a Ganache contract: no file version to invalidate on
+    monkeypatch.setattr(anchoring, "backend_for_integrity", lambda integrity: chain)
+
+    rec = {"mrv_id": "MRV-1", "energy_emissions": {"energy_kwh": 1}}
+    rec["integrity"] = {"blockchain_network": anchoring.GANACHE_NETWORK, "contract_address": chain.address}
+    records = tmp_path / "records"
+    records.mkdir()
+    (records / "MRV-1.json").write_text(json.dumps(rec), encoding="utf-8")
+
+    at = _app(records)
+    assert not at.exception
+    assert "NOT FOUND" in _statuses(at)["MRV-1"]
+
+    chain.anchor("MRV-1", compute_mrv_sha256(rec))
+    at.run()
+    assert "VALID" in _statuses(at)["MRV-1"]